@@ -1,4 +1,4 @@
-from flask import Flask, request
+from flask import Flask, request, jsonify
 from config import Config
 from app.extensions import init_extensions
 
@@ -8,13 +8,54 @@ def create_app():
 
     init_extensions(app)
 
+    # gzip HTML/JSON responses from every route except static files
+    from app.utils.compression import compressor
+    compressor.init_app(app)
+
     # Import utils inside the function to avoid circular imports
     from app.utils import utils
+    from app.utils import db_helper
+    from app.utils.search_index import product_index
+    from app.utils.suggest_index import suggest_index
+
+    # Make sure every collection has the indexes its queries rely on
+    if app.config.get('CREATE_INDEXES_ON_STARTUP'):
+        from app.utils.db_indexes import ensure_indexes, format_report
+        try:
+            for line in format_report(ensure_indexes(db_helper.db)):
+                utils.logger.info(f"Index {line}")
+        except Exception as e:
+            utils.logger.error(f"Index provisioning failed: {e}")
+
+    # In-memory catalog search index; later rebuilds follow the catalog version
+    # in the background, and searches use the database until it catches up
+    try:
+        db_helper.refresh_search_index(background=False)
+        utils.logger.info(f"Search index built with {len(product_index)} products")
+    except Exception as e:
+        utils.logger.error(f"Search index build failed: {e}")
+
+    # Typeahead suggestions; later rebuilds follow the catalog version in the background
+    try:
+        db_helper.refresh_suggest_index(background=False)
+        utils.logger.info(f"Suggest index built with {len(suggest_index)} products")
+    except Exception as e:
+        utils.logger.error(f"Suggest index build failed: {e}")
+
+    # Endpoints that never read the session, so cleaning it would be wasted work
+    SESSION_CLEAN_SKIP_ENDPOINTS = {'static', 'health', 'api.list_products', 'api.get_product',
+                                    'api.suggest'}
+
+    @app.route('/health')
+    def health():
+        return jsonify({'status': 'ok'})
 
     # Global before_request to clean session for all routes
     @app.before_request
     def clean_session():
         """Clean session before each request to prevent serialization errors"""
+        if request.endpoint in SESSION_CLEAN_SKIP_ENDPOINTS:
+            return
         try:
             # Get the request path to determine if we're in checkout flow
             request_path = request.path
@@ -38,7 +79,7 @@ def create_app():
             is_checkout_flow = is_exact_checkout_route or is_buy_now_prefix
             
             if not is_checkout_flow:
-                # Clean cart data only when not in checkout flow
+                # Clean cart reference only when not in checkout flow
                 utils.clean_cart_session()
                 # Clean buy-now item data only when not in checkout flow
                 utils.clean_buy_now_session()
@@ -51,10 +92,12 @@ def create_app():
     from app.routes.product_routes import product_bp
     from app.routes.cart_routes import cart_bp
     from app.routes.order_routes import order_bp
+    from app.routes.api_routes import api_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(product_bp)
     app.register_blueprint(cart_bp)
     app.register_blueprint(order_bp)
+    app.register_blueprint(api_bp)
 
     return app
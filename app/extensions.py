@@ -1,7 +1,41 @@
 from flask_login import LoginManager
+from app.utils.db_connection import mongo
+from app.utils.passwords import password_hasher
+from app.utils.cache import principal_cache, product_cache, count_cache
+from app.utils import cart_store
+from app.utils import json_provider
+from app.utils.assets import asset_manifest
+from app.utils.suggest_index import suggest_index
+from app.utils import db_helper
 
 login_manager = LoginManager()
 
 def init_extensions(app):
+    json_provider.init_app(app)
+    mongo.init_app(app)
+    password_hasher.init_app(app)
+    principal_cache.configure(
+        maxsize=app.config.get('PRINCIPAL_CACHE_SIZE'),
+        ttl=app.config.get('PRINCIPAL_CACHE_TTL')
+    )
+    product_cache.configure(
+        maxsize=app.config.get('PRODUCT_CACHE_SIZE'),
+        ttl=app.config.get('PRODUCT_CACHE_TTL')
+    )
+    db_helper.PRODUCT_NOT_FOUND_TTL = app.config.get('PRODUCT_CACHE_NEGATIVE_TTL', db_helper.PRODUCT_NOT_FOUND_TTL)
+    count_cache.configure(ttl=app.config.get('LISTING_COUNT_CACHE_TTL'))
+    total_mode = app.config.get('LISTING_TOTAL_MODE', 'exact')
+    if total_mode not in db_helper.LISTING_TOTAL_MODES:
+        raise ValueError(f"LISTING_TOTAL_MODE must be one of {db_helper.LISTING_TOTAL_MODES}")
+    db_helper.LISTING_TOTAL_MODE = total_mode
+    cart_store.init_app(app)
+    db_helper.catalog_cache.configure(
+        check_interval=app.config.get('CATALOG_VERSION_CHECK_SECONDS')
+    )
+    suggest_index.configure(
+        memory_budget_mb=app.config.get('SUGGEST_MEMORY_BUDGET_MB'),
+        max_age=app.config.get('SUGGEST_MAX_AGE_SECONDS')
+    )
+    asset_manifest.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
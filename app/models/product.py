@@ -0,0 +1,41 @@
+class ProductSummary:
+    """Compact, read-only view of a product for list pages.
+
+    Holds only the fields the grid and cart render. ``__slots__`` drops the
+    per-instance ``__dict__``, so a page of summaries is a fraction of the
+    size of the raw Mongo documents.
+    """
+    __slots__ = ('StockCode', 'Description', 'price_inr', 'primary_image', 'seller')
+
+    def __init__(self, StockCode, Description='', price_inr=0, primary_image=None, seller=None):
+        self.StockCode = StockCode
+        self.Description = Description
+        self.price_inr = price_inr
+        self.primary_image = primary_image
+        self.seller = seller
+
+    @classmethod
+    def from_doc(cls, doc):
+        return cls(
+            doc.get('StockCode'),
+            doc.get('Description', ''),
+            doc.get('price_inr', 0),
+            doc.get('primary_image'),
+            doc.get('seller'),
+        )
+
+    def __getitem__(self, key):
+        # Lets code written against the raw dicts keep using product['price_inr']
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f'ProductSummary({self.StockCode!r}, {self.Description!r})'
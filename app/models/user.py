@@ -1,34 +1,21 @@
-class User:
+from flask_login import UserMixin
+
+
+class User(UserMixin):
+    # UserMixin supplies is_authenticated/is_active/is_anonymous as properties,
+    # matching Flask-Login's AnonymousUserMixin for logged-out visitors
     def __init__(self, user_id, username):
         self.id = user_id
         self.username = username
         self.role = 'customer'
 
-    def is_authenticated(self):
-        return True
-
-    def is_active(self):
-        return True
-
-    def is_anonymous(self):
-        return False
-
     def get_id(self):
         return self.id
 
-class AdminSeller:
+class AdminSeller(UserMixin):
     def __init__(self, username, role='seller'):
         self.username = username
         self.role = role
 
-    def is_authenticated(self):
-        return True
-
-    def is_active(self):
-        return True
-
-    def is_anonymous(self):
-        return False
-
     def get_id(self):
         return f'admin_seller_{self.username}'
@@ -0,0 +1,127 @@
+import hashlib
+from flask import Blueprint, jsonify, request, make_response
+from app.utils import db_helper
+
+# Version 1 of the JSON catalog API; breaking changes go into a new blueprint
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+DEFAULT_SUGGESTIONS = 8
+MAX_SUGGESTIONS = 20
+# Browsers may reuse suggestions while the user retypes a prefix
+SUGGEST_CACHE_SECONDS = 60
+
+
+def api_error(message, status):
+    return make_response(jsonify({'error': message}), status)
+
+
+def parse_fields():
+    """Parse ?fields=a,b into a tuple of API fields; None means the defaults.
+
+    Raises:
+        ValueError: if an unknown field is requested
+    """
+    raw = request.args.get('fields', '').strip()
+    if not raw:
+        return None
+    fields = tuple(dict.fromkeys(field.strip() for field in raw.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in db_helper.API_PRODUCT_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown fields: {', '.join(unknown)}; "
+                         f"allowed: {', '.join(db_helper.API_PRODUCT_FIELDS)}")
+    return fields
+
+
+def catalog_etag():
+    """ETag for the current request, changing whenever the catalog does."""
+    key = f'{db_helper.get_cached_catalog_version()}|{request.full_path}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def conditional_response(build):
+    """Answer with 304 if the client's ETag is current, else with build().
+
+    Only successful responses are tagged; errors are returned as they are.
+    """
+    etag = catalog_etag()
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        response = build()
+        if response.status_code != 200:
+            return response
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+@api_bp.route('/products')
+def list_products():
+    """List or search main products in StockCode order.
+
+    Query args: q, cursor, limit (1-100) and fields (comma-separated).
+    """
+    try:
+        fields = parse_fields()
+    except ValueError as e:
+        return api_error(str(e), 400)
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return api_error('limit must be a whole number', 400)
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return api_error(f'limit must be between 1 and {MAX_PAGE_SIZE}', 400)
+    search_query = request.args.get('q', '').strip().lower()
+    cursor = request.args.get('cursor') or None
+
+    def build():
+        try:
+            result = db_helper.get_products_api_page(search_query, cursor, limit, fields)
+        except ValueError as e:
+            return api_error(str(e), 400)
+        return jsonify({
+            'products': result['products'],
+            'has_prev': result['has_prev'],
+            'has_next': result['has_next'],
+            'prev_cursor': result['prev_cursor'],
+            'next_cursor': result['next_cursor'],
+        })
+
+    return conditional_response(build)
+
+
+@api_bp.route('/products/<stock_code>')
+def get_product(stock_code):
+    """One main product by StockCode, limited to ?fields= when given."""
+    try:
+        fields = parse_fields()
+    except ValueError as e:
+        return api_error(str(e), 400)
+
+    def build():
+        product = db_helper.get_product_api_fields(stock_code, fields)
+        if product is None:
+            return api_error('product not found', 404)
+        return jsonify(product)
+
+    return conditional_response(build)
+
+
+@api_bp.route('/suggest')
+def suggest():
+    """Typeahead suggestions for ?q=, ranked by popularity."""
+    try:
+        limit = int(request.args.get('limit', DEFAULT_SUGGESTIONS))
+    except ValueError:
+        return api_error('limit must be a number', 400)
+    limit = max(1, min(limit, MAX_SUGGESTIONS))
+    search_query = request.args.get('q', '').strip()
+
+    response = jsonify({
+        'query': search_query,
+        'suggestions': db_helper.suggest_products(search_query, limit) if search_query else [],
+    })
+    response.headers['Cache-Control'] = f'public, max-age={SUGGEST_CACHE_SECONDS}'
+    return response
@@ -11,7 +11,7 @@ def load_user(user_id):
     # Check if it's an admin_seller
     if user_id.startswith('admin_seller_'):
         username = user_id.replace('admin_seller_', '')
-        admin_seller_data = db_helper.get_admin_seller_by_username(username)
+        admin_seller_data = db_helper.get_cached_admin_seller(username)
         if admin_seller_data:
             return AdminSeller(admin_seller_data["username"], admin_seller_data["role"])
     # Regular user
@@ -21,29 +21,8 @@ def add_to_cart(product_id):
     if not product:
         return jsonify({'success': False, 'message': 'Product not found'}), 404
 
-    # Get and clean cart from session
-    cart = utils.clean_cart_session()
-
-    # Convert product_id to int and add or update item in cart
-    #product_id = int(product_id)
-    if product_id in cart:
-        cart[product_id] = int(cart[product_id]) + 1
-    else:
-        cart[product_id] = 1
-
-    # Ensure all keys are strings and values are positive integers
-    cleaned_cart = {}
-    for k, v in cart.items():
-        try:
-            key = str(k) if isinstance(k, (int, str)) else None
-            value = int(v) if isinstance(v, (int, str)) else None
-            if key is not None and value is not None and value > 0:
-                cleaned_cart[key] = value
-        except (ValueError, TypeError):
-            continue
-
-    session['cart'] = cleaned_cart
-    session.modified = True
+    # Atomically add the item in the cart store
+    cleaned_cart = utils.add_to_cart(product_id)
 
     # Calculate cart count
     cart_count = sum(cleaned_cart.values())
@@ -57,14 +36,16 @@ def add_to_cart(product_id):
 @cart_bp.route('/cart')
 @login_required
 def cart():
-    # Clean and validate cart from session
-    cart = utils.clean_cart_session()
+    # Load cart from the cart store
+    cart = utils.get_cart()
     
     cart_items = []
     cart_total = 0
     
+    products = db_helper.get_products_by_ids(cart.keys())
+
     for product_id, quantity in cart.items():
-        product = db_helper.get_product_by_id(product_id)
+        product = products.get(str(product_id))
 
         if product:
             item_total = product['price_inr'] * quantity
@@ -91,20 +72,7 @@ def update_cart():
     product_id = str(data.get('product_id'))
     quantity = int(data.get('quantity', 0))
 
-    cart = session.get('cart', {})
-    if not isinstance(cart, dict):
-        cart = {}
-
-    if quantity <= 0:
-        cart.pop(product_id, None)
-    else:
-        cart[product_id] = quantity
-
-    # Clean cart using utils function
-    cleaned_cart = utils.clean_cart_session()
-
-    session['cart'] = cleaned_cart
-    session.modified = True
+    cleaned_cart = utils.set_cart_item(product_id, quantity)
 
     cart_count = sum(cleaned_cart.values())
 
@@ -115,9 +83,7 @@ def update_cart():
 def remove_from_cart(product_id):
     #product_id = db_helper.get_product_by_id(product_id)
     print(product_id)
-    cart = session.get('cart', {})
-    cart.pop(product_id, None)
-    session['cart'] = cart
+    cart = utils.set_cart_item(product_id, 0)
     
     cart_count = sum(cart.values())
     
@@ -8,7 +8,7 @@ order_bp = Blueprint('order', __name__)
 @order_bp.route('/checkout', methods=['POST'])
 @login_required
 def checkout():
-    cart = session.get('cart', {})
+    cart = utils.get_cart()
     buy_now_item = session.get('buy_now_item')
 
     # Check if there's something to checkout
@@ -51,8 +51,10 @@ def checkout():
     total = 0
     cart_items_detail = []
 
+    products = db_helper.get_products_by_ids(cart.keys())
+
     for product_id, quantity in cart.items():
-        product = db_helper.get_product_by_id(product_id)
+        product = products.get(str(product_id))
 
         if product:
             item_total = product['price_inr'] * quantity
@@ -66,8 +68,16 @@ def checkout():
         total += buy_now_total
         buy_now_detail = f"{buy_now_item['product']['Description']} x{buy_now_item['quantity']}"
 
+    # Sold quantities feed the popularity ranking of search suggestions
+    sold = {product_id: quantity for product_id, quantity in cart.items() if str(product_id) in products}
+    if buy_now_item:
+        stock_code = buy_now_item['product'].get('StockCode')
+        if stock_code:
+            sold[stock_code] = sold.get(stock_code, 0) + buy_now_item['quantity']
+    db_helper.record_sales(sold)
+
     # Clear cart and buy-now item after successful checkout
-    session.pop('cart', None)
+    utils.clear_cart()
     session.pop('buy_now_item', None)
     session.modified = True
 
@@ -158,6 +168,9 @@ def buy_now_checkout(product_id):
             order_summary += f"<br>Address: {address}"
             order_summary += f"<br>Payment: {masked_card}"
         
+        if product.get('StockCode'):
+            db_helper.record_sales({product['StockCode']: quantity})
+
         # Create success message
         flash(order_summary, 'success')
         
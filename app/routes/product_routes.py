@@ -1,18 +1,113 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+import hashlib
+from flask import (Blueprint, render_template, stream_template, request, redirect, url_for, flash,
+                   get_flashed_messages, session, make_response, Response, stream_with_context,
+                   abort)
+from markupsafe import Markup
 from flask_login import login_required, current_user
 from app.utils import db_helper
 from app.utils import utils
+from app.utils.pagination import MAX_OFFSET_PAGE
+from app.utils.cache import fragment_cache
+from app.utils.assets import asset_manifest
 
 product_bp = Blueprint('product', __name__)
 
+# Pagination configuration
+ITEMS_PER_PAGE = 12  # Can be adjusted to 20 as needed
+DASHBOARD_PER_PAGE = 50
+DASHBOARD_SORT_LABELS = {
+    'stock_code': 'Stock code',
+    'name': 'Name',
+    'price': 'Price',
+}
+HOME_SORT_LABELS = {
+    'featured': 'Featured',
+    'price_asc': 'Price: low to high',
+    'price_desc': 'Price: high to low',
+}
+# Import errors listed on the report page; the counts always cover every row
+IMPORT_ERROR_LIMIT = 500
+
+def parse_price_arg(name):
+    """Read a whole-rupee price bound from the query string; invalid values are ignored"""
+    try:
+        value = int(request.args.get(name, ''))
+    except ValueError:
+        return None
+    return value if value >= 0 else None
+
+def grid_filter_args(search_query, min_price, max_price, sort):
+    """Query string arguments that select the listing, carried by every page link"""
+    args = {'q': search_query}
+    if min_price is not None:
+        args['min_price'] = min_price
+    if max_price is not None:
+        args['max_price'] = max_price
+    if sort != 'featured':
+        args['sort'] = sort
+    return {key: value for key, value in args.items() if value or value == 0}
+
+def render_product_grid(search_query, page, cursor, is_authenticated,
+                        min_price=None, max_price=None, sort='featured'):
+    """Render the product grid and pagination block for one page of results.
+
+    Returns (html, cacheable); searches answered while the search index was
+    catching up must not be cached under the new catalog version.
+    """
+    # Filter, sort, count and page on the database server
+    result = db_helper.search_products(
+        search_query, page=page, per_page=ITEMS_PER_PAGE, cursor=cursor,
+        min_price=min_price, max_price=max_price, sort=sort
+    )
+    page = result['page']
+    filter_args = grid_filter_args(search_query, min_price, max_price, sort)
+
+    # Shallow pages are linked by number, deeper ones by cursor
+    def page_link(page_num, page_cursor):
+        args = dict(filter_args)
+        if page_num is not None and page_num <= MAX_OFFSET_PAGE or not page_cursor:
+            args['page'] = page_num
+        else:
+            args['cursor'] = page_cursor
+        return args
+
+    # Pagination metadata for template
+    pagination = {
+        'mode': 'cursor' if cursor else 'page',
+        'current_page': page,
+        'total_pages': result['total_pages'],
+        'has_prev': result['has_prev'],
+        'has_next': result['has_next'],
+        'prev_args': page_link(page - 1 if page else None, result['prev_cursor']),
+        'next_args': page_link(page + 1 if page else None, result['next_cursor']),
+        'last_args': page_link(result['total_pages'], result['last_cursor']),
+        'max_offset_page': MAX_OFFSET_PAGE,
+        'items_per_page': ITEMS_PER_PAGE,
+        'total_items': result['total']
+    }
+
+    html = render_template('product_grid.html',
+                           products=result['products'],
+                           is_authenticated=is_authenticated,
+                           pagination=pagination,
+                           filter_args=filter_args,
+                           search_query=search_query)
+    return html, not result['index_behind']
+
+def product_grid_etag(catalog_version, search_query, page, cursor,
+                      min_price=None, max_price=None, sort='featured'):
+    """ETag for the anonymous home page, which changes with the catalog and each deploy"""
+    key = f'{asset_manifest.release}|{catalog_version}|{search_query}|{page}|{cursor or ""}|{min_price}|{max_price}|{sort}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
 @product_bp.route('/')
 def home():
-    # Clean and validate cart from session
-    cart = utils.clean_cart_session()
-    cart_count = sum(cart.values()) if cart else 0
+    # A plain bool: it is part of the fragment cache key
+    is_authenticated = bool(current_user.is_authenticated)
 
-    # Pagination configuration
-    ITEMS_PER_PAGE = 12  # Can be adjusted to 20 as needed
+    # Load cart from the cart store; only logged-in users see the cart badge
+    cart = utils.get_cart() if is_authenticated else {}
+    cart_count = sum(cart.values()) if cart else 0
 
     # Get current page from query parameter, default to 1
     try:
@@ -25,52 +120,64 @@ def home():
     # Get search query
     search_query = request.args.get('q', '').strip().lower()
 
-    # Get all products
-    all_products = db_helper.get_products()
-
-    # Filter products by search query if provided
-    if search_query:
-        all_products = [
-            product for product in all_products
-            if search_query in product.get('Description', '').lower() or
-               search_query in str(product.get('StockCode', '')).lower()
-        ]
-
-    # Calculate total products after search
-    total_products = len(all_products)
-
-    # Paginate the filtered products
-    start_index = (page - 1) * ITEMS_PER_PAGE
-    end_index = start_index + ITEMS_PER_PAGE
-    paginated_products = all_products[start_index:end_index]
-
-    # Calculate pagination metadata
-    total_pages = (total_products + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE if total_products > 0 else 1
-
-    # Ensure page doesn't exceed total pages
-    if page > total_pages and total_pages > 0:
-        page = total_pages
-        start_index = (page - 1) * ITEMS_PER_PAGE
-        end_index = start_index + ITEMS_PER_PAGE
-        paginated_products = all_products[start_index:end_index]
-
-    # Pagination metadata for template
-    pagination = {
-        'current_page': page,
-        'total_pages': total_pages,
-        'has_prev': page > 1,
-        'has_next': page < total_pages,
-        'items_per_page': ITEMS_PER_PAGE,
-        'total_items': total_products
-    }
-
-    return render_template('home.html',
-                           products=paginated_products,
-                           cart=cart,
-                           cart_count=cart_count,
-                           current_user=current_user,
-                           pagination=pagination,
-                           search_query=search_query)
+    # Opaque keyset cursor used for pages beyond MAX_OFFSET_PAGE
+    cursor = request.args.get('cursor') or None
+
+    # Price band and sort order, applied on the database server
+    min_price = parse_price_arg('min_price')
+    max_price = parse_price_arg('max_price')
+    if min_price is not None and max_price is not None and min_price > max_price:
+        min_price, max_price = max_price, min_price
+    sort = request.args.get('sort', 'featured')
+    if sort not in db_helper.HOME_SORTS:
+        sort = 'featured'
+
+    # Deep pages are only reachable by cursor; numbered links stop at
+    # MAX_OFFSET_PAGE, so a deeper page number would only buy a slow skip()
+    if page > MAX_OFFSET_PAGE and not cursor and \
+            not db_helper.search_pages_in_memory(search_query, min_price, max_price, sort):
+        abort(404)
+
+    catalog_version = db_helper.get_cached_catalog_version()
+
+    # Anonymous pages without flash messages depend only on the catalog and
+    # the query string, so repeat views can be answered with 304
+    etag = None
+    if not is_authenticated and not session.get('_flashes'):
+        etag = product_grid_etag(catalog_version, search_query, page, cursor,
+                                 min_price, max_price, sort)
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+    fragment_key = (catalog_version, search_query, page, cursor, min_price, max_price, sort,
+                    is_authenticated)
+    product_grid = fragment_cache.get(fragment_key, label='product.home')
+    if product_grid is None:
+        product_grid, cacheable = render_product_grid(search_query, page, cursor, is_authenticated,
+                                                      min_price, max_price, sort)
+        if cacheable:
+            fragment_cache.set(fragment_key, product_grid)
+        else:
+            # Nor tag it for revalidation; the fallback matches differently
+            etag = None
+
+    response = make_response(render_template('home.html',
+                                             product_grid=Markup(product_grid),
+                                             cart=cart,
+                                             cart_count=cart_count,
+                                             current_user=current_user,
+                                             search_query=search_query,
+                                             min_price=min_price,
+                                             max_price=max_price,
+                                             sort=sort,
+                                             sorts=HOME_SORT_LABELS))
+    if etag:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @product_bp.route('/admin_seller/dashboard')
 @login_required
@@ -80,18 +187,64 @@ def admin_seller_dashboard():
         flash('Access denied. Admin/Seller only.', 'error')
         return redirect(url_for('product.home'))
 
-    # Get main products and mark them as not seller products
-    all_products = []
-    for product in db_helper.get_products():
-        all_products.append({
-            **product,
-            'seller': None,
-            'is_seller_product': False
-        })
+    search_query = request.args.get('q', '').strip()
+    sort = request.args.get('sort', 'stock_code')
+    if sort not in db_helper.DASHBOARD_SORTS:
+        sort = 'stock_code'
+    cursor = request.args.get('cursor') or None
+
+    # Rows are pulled from the Mongo cursor while the template streams
+    products = db_helper.stream_dashboard_products(
+        search_query, sort, cursor, per_page=DASHBOARD_PER_PAGE
+    )
+
+    # The session cookie is written before a streamed body, so flashes must be
+    # consumed here rather than inside the template
+    messages = get_flashed_messages(with_categories=True)
+
+    return Response(stream_template('admin_seller_dashboard.html',
+                                    products=products,
+                                    total=db_helper.count_dashboard_products(search_query),
+                                    messages=messages,
+                                    search_query=search_query,
+                                    sort=sort,
+                                    sorts=DASHBOARD_SORT_LABELS,
+                                    seller_products={}),
+                    mimetype='text/html')
+
+@product_bp.route('/admin_seller/import_products', methods=['GET', 'POST'])
+@login_required
+def admin_seller_import_products():
+    """Admin/Seller can upsert many products at once from a CSV file"""
+    if not hasattr(current_user, 'role') or current_user.role != 'admin_seller':
+        flash('Access denied. Admin/Seller only.', 'error')
+        return redirect(url_for('product.home'))
+
+    stats = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Choose a CSV file to import.', 'error')
+            return redirect(url_for('product.admin_seller_import_products'))
 
+        # Rows are read from the upload and written in batches, never all at once
+        stats = db_helper.import_products_csv(upload.stream)
 
+    return render_template('admin_seller_import_products.html',
+                           stats=stats,
+                           error_limit=IMPORT_ERROR_LIMIT)
+
+@product_bp.route('/admin_seller/export_products.csv')
+@login_required
+def admin_seller_export_products():
+    """Admin/Seller can download the catalog as CSV in the import format"""
+    if not hasattr(current_user, 'role') or current_user.role != 'admin_seller':
+        flash('Access denied. Admin/Seller only.', 'error')
+        return redirect(url_for('product.home'))
 
-    return render_template('admin_seller_dashboard.html', products=all_products, seller_products={})
+    return Response(stream_with_context(db_helper.export_products_csv()),
+                    mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=products.csv'})
 
 @product_bp.route('/admin_seller/add_product', methods=['GET', 'POST'])
 @login_required
@@ -88,6 +88,35 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // As-you-type search suggestions
+    const searchInput = document.querySelector('.search-form input[name="q"]');
+    const suggestionList = document.getElementById('search-suggestions');
+    if (searchInput && suggestionList) {
+        let suggestTimer = null;
+        let lastQuery = '';
+        searchInput.addEventListener('input', function() {
+            clearTimeout(suggestTimer);
+            const query = this.value.trim();
+            if (query.length < 2 || query === lastQuery) {
+                return;
+            }
+            // Wait for a pause in typing before asking the server
+            suggestTimer = setTimeout(() => {
+                lastQuery = query;
+                fetch(`${searchInput.dataset.suggestUrl}?q=${encodeURIComponent(query)}`)
+                    .then(response => response.json())
+                    .then(data => {
+                        suggestionList.replaceChildren(...data.suggestions.map(suggestion => {
+                            const option = document.createElement('option');
+                            option.value = suggestion.Description || suggestion.StockCode;
+                            return option;
+                        }));
+                    })
+                    .catch(() => {});
+            }, 150);
+        });
+    }
+
     // Handle login requirement for non-authenticated users
     loginRequiredButtons.forEach(button => {
         button.addEventListener('click', function() {
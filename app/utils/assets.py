@@ -0,0 +1,176 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from flask import request, send_from_directory, session
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are optional; gzip is always written
+    brotli = None
+
+# Fingerprinted copies live under static/<BUILD_DIR>/ next to the manifest
+BUILD_DIR = 'build'
+MANIFEST_NAME = 'manifest.json'
+ASSET_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt')
+# Precompressing tiny files costs more in headers than it saves
+MIN_COMPRESS_SIZE = 256
+# Hashed files never change in place, so caches may keep them for a year
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Accept-Encoding token -> file suffix, in order of preference
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def fingerprint(data, length=10):
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def hashed_name(filename, digest):
+    """css/styles.css -> css/styles.<digest>.css"""
+    root, ext = os.path.splitext(filename)
+    return f'{root}.{digest}{ext}'
+
+
+def iter_source_assets(static_folder):
+    """Yield static-relative paths of assets to fingerprint, skipping the build output."""
+    for dirpath, dirnames, filenames in os.walk(static_folder):
+        if os.path.abspath(dirpath) == os.path.abspath(static_folder):
+            dirnames[:] = [d for d in dirnames if d != BUILD_DIR]
+        for filename in sorted(filenames):
+            if filename.endswith(ASSET_EXTENSIONS):
+                path = os.path.join(dirpath, filename)
+                yield os.path.relpath(path, static_folder).replace(os.sep, '/')
+
+
+def write_precompressed(path, data):
+    """Write .gz (and .br when brotli is installed) siblings of path."""
+    written = []
+    if len(data) < MIN_COMPRESS_SIZE:
+        return written
+    with open(path + '.gz', 'wb') as f:
+        # mtime=0 keeps the output byte-identical between builds
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    written.append(path + '.gz')
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+        written.append(path + '.br')
+    return written
+
+
+def build_assets(static_folder):
+    """Write fingerprinted, precompressed copies of every static asset.
+
+    Output goes to static/build/ and a manifest mapping the original name
+    to the hashed one is written alongside it. Stale builds are replaced.
+
+    Returns:
+        dict: {original filename: hashed filename relative to static/}
+    """
+    build_root = os.path.join(static_folder, BUILD_DIR)
+    if os.path.isdir(build_root):
+        shutil.rmtree(build_root)
+
+    manifest = {}
+    for filename in iter_source_assets(static_folder):
+        with open(os.path.join(static_folder, filename), 'rb') as f:
+            data = f.read()
+        target = f'{BUILD_DIR}/{hashed_name(filename, fingerprint(data))}'
+        target_path = os.path.join(static_folder, *target.split('/'))
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        with open(target_path, 'wb') as f:
+            f.write(data)
+        write_precompressed(target_path, data)
+        manifest[filename] = target
+
+    with open(os.path.join(build_root, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+class AssetManifest:
+    """Serve fingerprinted static assets built by scripts/build_assets.py.
+
+    ``url_for('static', filename='css/styles.css')`` resolves to the hashed
+    copy when the manifest lists it, and hashed files are served with
+    immutable cache headers (precompressed when the client accepts it), so
+    browsers and CDNs stop asking the app for them after the first hit.
+    Without a manifest, static files are served unchanged.
+
+    ``release`` combines BUILD_ID with a hash of the manifest. Validators of
+    rendered pages include it, since those pages link the hashed asset URLs.
+    """
+
+    def __init__(self):
+        self.manifest = {}
+        self.static_folder = None
+        self.release = ''
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        self.manifest = {}
+        if app.config.get('FINGERPRINT_STATIC_ASSETS', True):
+            self.manifest = self.load(os.path.join(self.static_folder, BUILD_DIR, MANIFEST_NAME))
+        manifest_hash = fingerprint(json.dumps(self.manifest, sort_keys=True).encode('utf-8'))
+        self.release = f"{app.config.get('BUILD_ID', '')}:{manifest_hash}"
+        app.extensions['asset_manifest'] = self
+        app.url_defaults(self.rewrite_static_url)
+        app.before_request(self.serve_precompressed)
+        app.after_request(self.add_cache_headers)
+
+    @staticmethod
+    def load(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def rewrite_static_url(self, endpoint, values):
+        """url_defaults hook: point static URLs at the fingerprinted copy."""
+        if endpoint == 'static' and self.manifest:
+            filename = values.get('filename')
+            if filename in self.manifest:
+                values['filename'] = self.manifest[filename]
+
+    def is_fingerprinted(self, filename):
+        return bool(filename) and filename.startswith(BUILD_DIR + '/')
+
+    def serve_precompressed(self):
+        """Answer hashed asset requests with a .br/.gz variant when accepted."""
+        if request.endpoint != 'static':
+            return None
+        filename = (request.view_args or {}).get('filename')
+        if not self.is_fingerprinted(filename):
+            return None
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in request.accept_encodings:
+                continue
+            if not os.path.isfile(os.path.join(self.static_folder, *(filename + suffix).split('/'))):
+                continue
+            response = send_from_directory(self.static_folder, filename + suffix,
+                                           mimetype=mimetypes.guess_type(filename)[0],
+                                           max_age=31536000)
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+        return None
+
+    def add_cache_headers(self, response):
+        if request.endpoint == 'static' and \
+                self.is_fingerprinted((request.view_args or {}).get('filename')) and \
+                response.status_code in (200, 304):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+            response.vary.add('Accept-Encoding')
+            # Flask-Login peeks at the session in its own after_request, which
+            # would make Flask add Vary: Cookie, and shared caches won't store
+            # responses that vary on cookies. The asset never depends on it.
+            if not session.modified:
+                session.accessed = False
+        return response
+
+
+asset_manifest = AssetManifest()
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    The cache is per process: invalidate() only affects the current worker,
+    other workers pick up the change once their entry expires.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # label -> [hits, misses], e.g. per route
+        self._label_counts = {}
+
+    def configure(self, maxsize=None, ttl=None):
+        """Change limits at runtime (e.g. from app.config) and drop all entries."""
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = int(maxsize)
+            if ttl is not None:
+                self.ttl = float(ttl)
+            self._data.clear()
+
+    def get(self, key, default=None, label=None):
+        """Return a live entry and count a hit, otherwise count a miss.
+
+        Counts are also kept per ``label`` when one is given.
+        """
+        now = time.monotonic()
+        with self._lock:
+            counts = self._label_counts.setdefault(label, [0, 0]) if label is not None else None
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                if counts is not None:
+                    counts[0] += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            if counts is not None:
+                counts[1] += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        """Store value for ``ttl`` seconds, defaulting to the cache's TTL."""
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Report hit/miss counters, overall and per label, and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'by_label': {
+                    label: {
+                        'hits': hits,
+                        'misses': misses,
+                        'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+                    }
+                    for label, (hits, misses) in self._label_counts.items()
+                },
+            }
+
+
+# Admin/seller accounts keyed by username, used by auth_routes.load_user()
+principal_cache = TTLCache(maxsize=1024, ttl=60)
+
+# Main products keyed by (catalog version, StockCode), used by db_helper.get_product_by_id()
+product_cache = TTLCache(maxsize=10000, ttl=60)
+
+# Listing totals keyed by collection and filter, used in 'cached' total mode
+count_cache = TTLCache(maxsize=1024, ttl=60)
+
+# Rendered product grid fragments keyed by catalog version and request args
+fragment_cache = TTLCache(maxsize=512, ttl=300)
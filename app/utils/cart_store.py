@@ -0,0 +1,170 @@
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pymongo import ReturnDocument
+from app.utils.db_connection import mongo
+
+
+def is_valid_item_key(product_id):
+    """Item keys become Mongo field names, so they may not contain '.' or start with '$'."""
+    return bool(product_id) and '.' not in product_id and not product_id.startswith('$')
+
+
+def _clean_items(items):
+    """Keep positive integer quantities, ordered by StockCode."""
+    return {
+        str(k): int(v) for k, v in sorted((items or {}).items())
+        if isinstance(v, int) and v > 0
+    }
+
+
+class CartStore(ABC):
+    """Interface for server-side carts keyed by an opaque cart id.
+
+    Every method returns the cart's items after the operation as a
+    ``{StockCode: quantity}`` dict. Backends must implement every abstract
+    method; an incomplete one fails when it is constructed.
+    """
+
+    @abstractmethod
+    def get(self, cart_id):
+        """Return the cart's items, or {} if it doesn't exist."""
+
+    @abstractmethod
+    def add_item(self, cart_id, product_id, quantity=1):
+        """Atomically increase an item's quantity, creating the cart if needed."""
+
+    @abstractmethod
+    def set_item(self, cart_id, product_id, quantity):
+        """Set an item's quantity; zero or less removes it."""
+
+    def remove_item(self, cart_id, product_id):
+        return self.set_item(cart_id, product_id, 0)
+
+    @abstractmethod
+    def clear(self, cart_id):
+        """Empty the cart."""
+
+    @abstractmethod
+    def take(self, cart_id):
+        """Atomically delete the cart, returning the items it held (unlike the other methods)."""
+
+
+class MongoCartStore(CartStore):
+    """Carts stored as ``{_id: cart_id, items: {StockCode: qty}, updated_at}`` documents."""
+
+    def __init__(self, collection_name='carts'):
+        self.collection_name = collection_name
+
+    @property
+    def collection(self):
+        return mongo.get_collection(self.collection_name)
+
+    def get(self, cart_id):
+        cart = self.collection.find_one({"_id": cart_id}, {"items": 1})
+        return _clean_items(cart.get("items")) if cart else {}
+
+    def add_item(self, cart_id, product_id, quantity=1):
+        if not is_valid_item_key(product_id):
+            return self.get(cart_id)
+        cart = self.collection.find_one_and_update(
+            {"_id": cart_id},
+            {
+                "$inc": {f"items.{product_id}": int(quantity)},
+                "$set": {"updated_at": datetime.now(timezone.utc)}
+            },
+            projection={"items": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return _clean_items(cart.get("items"))
+
+    def set_item(self, cart_id, product_id, quantity):
+        if not is_valid_item_key(product_id):
+            return self.get(cart_id)
+        if quantity > 0:
+            update = {"$set": {f"items.{product_id}": int(quantity),
+                               "updated_at": datetime.now(timezone.utc)}}
+        else:
+            update = {"$unset": {f"items.{product_id}": ""},
+                      "$set": {"updated_at": datetime.now(timezone.utc)}}
+        cart = self.collection.find_one_and_update(
+            {"_id": cart_id},
+            update,
+            projection={"items": 1},
+            upsert=quantity > 0,
+            return_document=ReturnDocument.AFTER
+        )
+        return _clean_items(cart.get("items")) if cart else {}
+
+    def clear(self, cart_id):
+        self.collection.delete_one({"_id": cart_id})
+        return {}
+
+    def take(self, cart_id):
+        cart = self.collection.find_one_and_delete({"_id": cart_id}, projection={"items": 1})
+        return _clean_items(cart.get("items")) if cart else {}
+
+
+class MemoryCartStore(CartStore):
+    """Process-local cart store for tests and single-process development."""
+
+    def __init__(self):
+        self._carts = {}
+        self._lock = threading.Lock()
+
+    def get(self, cart_id):
+        with self._lock:
+            return _clean_items(self._carts.get(cart_id))
+
+    def add_item(self, cart_id, product_id, quantity=1):
+        if not is_valid_item_key(product_id):
+            return self.get(cart_id)
+        with self._lock:
+            items = self._carts.setdefault(cart_id, {})
+            items[product_id] = items.get(product_id, 0) + int(quantity)
+            return _clean_items(items)
+
+    def set_item(self, cart_id, product_id, quantity):
+        if not is_valid_item_key(product_id):
+            return self.get(cart_id)
+        with self._lock:
+            items = self._carts.setdefault(cart_id, {})
+            if quantity > 0:
+                items[product_id] = int(quantity)
+            else:
+                items.pop(product_id, None)
+            return _clean_items(items)
+
+    def clear(self, cart_id):
+        with self._lock:
+            self._carts.pop(cart_id, None)
+        return {}
+
+    def take(self, cart_id):
+        with self._lock:
+            return _clean_items(self._carts.pop(cart_id, None))
+
+
+CART_STORES = {
+    'mongo': MongoCartStore,
+    'memory': MemoryCartStore,
+}
+
+_cart_store = None
+
+
+def init_app(app):
+    """Select the backend named by app.config['CART_STORE']."""
+    global _cart_store
+    backend = app.config.get('CART_STORE', 'mongo')
+    _cart_store = CART_STORES[backend]()
+    app.extensions['cart_store'] = _cart_store
+
+
+def get_cart_store():
+    """Return the configured cart store, defaulting to Mongo."""
+    global _cart_store
+    if _cart_store is None:
+        _cart_store = MongoCartStore()
+    return _cart_store
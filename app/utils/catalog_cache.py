@@ -0,0 +1,32 @@
+import time
+
+
+class CatalogCache:
+    """Per-process view of the shared catalog version.
+
+    The version keys everything a worker caches about the catalog (product
+    lookups, rendered grids, search indexes, ETags). Reading it costs a
+    database round trip, so it is re-read at most every ``check_interval``
+    seconds; invalidate() forces the next read, e.g. after a local write.
+    """
+
+    def __init__(self, version_getter, check_interval=1.0):
+        self.version_getter = version_getter
+        self.check_interval = check_interval
+        self._version = None
+        self._version_checked_at = 0.0
+
+    def version(self):
+        """Return the catalog version, reading it at most every check_interval."""
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked_at >= self.check_interval:
+            self._version = self.version_getter()
+            self._version_checked_at = now
+        return self._version
+
+    def configure(self, check_interval=None):
+        if check_interval is not None:
+            self.check_interval = float(check_interval)
+
+    def invalidate(self):
+        self._version = None
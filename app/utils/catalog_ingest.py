@@ -0,0 +1,447 @@
+import ast
+import csv
+import io
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger('flask-ecommerce')
+
+USD_TO_INR_RATE = 96
+
+# Columns accepted by the admin import and written by the export
+IMPORT_COLUMNS = ('StockCode', 'Description', 'Price', 'price_inr', 'image_url')
+EXPORT_COLUMNS = ('StockCode', 'Description', 'price_inr', 'image_url')
+# A row must carry these to create a product; without them it only updates one
+REQUIRED_NEW_FIELDS = ('Description', 'price_inr')
+
+
+def parse_image_urls(raw):
+    """Parse the CSV's stringified Python list of image URLs into a list."""
+    if isinstance(raw, list):
+        urls = raw
+    elif not raw:
+        return []
+    else:
+        try:
+            urls = ast.literal_eval(raw)
+        except (ValueError, SyntaxError):
+            urls = raw.strip('[]').split(',')
+        if isinstance(urls, str):
+            urls = [urls]
+    return [str(url).strip().strip("'\"") for url in urls if str(url).strip().strip("'\"")]
+
+
+def image_fields(raw):
+    """Return the normalised image fields for a raw image_url value.
+
+    ``image_urls`` holds every URL and ``primary_image`` the first one, which
+    is all list views need.
+    """
+    urls = parse_image_urls(raw)
+    return {
+        'image_urls': urls,
+        'primary_image': urls[0] if urls else None,
+    }
+
+
+def _parse_price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'invalid price {value!r}') from None
+
+
+def normalize_row(row, usd_to_inr_rate=USD_TO_INR_RATE):
+    """Turn a products.csv row into a product document.
+
+    Raises:
+        ValueError: if the row has no StockCode or an unparseable price
+    """
+    # Absent columns and blank cells are left out, so they don't overwrite
+    # stored values: a StockCode,price_inr file reprices
+    row = {key: value.strip() if isinstance(value, str) else value
+           for key, value in row.items() if key}
+    row = {key: value for key, value in row.items() if value not in (None, '')}
+
+    stock_code = row.get('StockCode')
+    if not stock_code:
+        raise ValueError('missing StockCode')
+
+    # Convert price to integer INR
+    if 'Price' in row:
+        row['price_inr'] = int(_parse_price(row.pop('Price')) * usd_to_inr_rate)
+    elif 'price_inr' in row:
+        row['price_inr'] = int(_parse_price(row['price_inr']))
+    if row.get('price_inr', 0) < 0:
+        raise ValueError('negative price')
+
+    # Parsed image fields, plus the canonical stringified list for older readers
+    if 'image_url' in row:
+        row.update(image_fields(row.get('image_url')))
+        row['image_url'] = str(row['image_urls'])
+    return row
+
+
+def iter_chunks(path, chunk_size=5000, skip_rows=0, usd_to_inr_rate=USD_TO_INR_RATE):
+    """Stream a products.csv file as normalised chunks.
+
+    Yields:
+        (index of the chunk's first row, list of documents, list of (row number, error))
+    """
+    with open(path, mode='r', encoding='utf-8', newline='') as file:
+        yield from iter_file_chunks(file, chunk_size, skip_rows, usd_to_inr_rate)
+
+
+def iter_file_chunks(file, chunk_size=5000, skip_rows=0, usd_to_inr_rate=USD_TO_INR_RATE,
+                     columns=None):
+    """Stream an open CSV text file as normalised chunks, see iter_chunks().
+
+    Args:
+        columns: Keep only these columns of each row; None keeps them all
+    """
+    reader = csv.DictReader(file)
+    chunk, errors, chunk_start = [], [], skip_rows
+    for row_number, row in enumerate(reader):
+        if row_number < skip_rows:
+            continue
+        if columns is not None:
+            row = {key: value for key, value in row.items() if key in columns}
+        try:
+            chunk.append(normalize_row(row, usd_to_inr_rate))
+        except (ValueError, TypeError) as e:
+            errors.append((row_number, str(e)))
+        if row_number + 1 - chunk_start >= chunk_size:
+            yield chunk_start, chunk, errors
+            chunk, errors, chunk_start = [], [], row_number + 1
+    if chunk or errors:
+        yield chunk_start, chunk, errors
+
+
+def can_create(product):
+    """Whether a document is complete enough to insert as a new product."""
+    return all(field in product for field in REQUIRED_NEW_FIELDS)
+
+
+def unknown_updates(collection, products):
+    """Positions of update-only documents whose StockCode matches no product.
+
+    StockCodes created earlier in the same batch count as known.
+    """
+    partial = {product["StockCode"] for product in products if not can_create(product)}
+    if not partial:
+        return set()
+    known = {doc["StockCode"] for doc in collection.find({"StockCode": {"$in": list(partial)}},
+                                                        {"_id": 0, "StockCode": 1})}
+    unknown = set()
+    for position, product in enumerate(products):
+        if can_create(product):
+            known.add(product["StockCode"])
+        elif product["StockCode"] not in known:
+            unknown.add(position)
+    return unknown
+
+
+def superseded_positions(products):
+    """Positions of documents whose StockCode appears again later in the batch.
+
+    The last row for a StockCode wins, so these are dropped before writing:
+    an unordered bulk_write would apply same-StockCode updates in no
+    particular order.
+    """
+    last = {product["StockCode"]: position for position, product in enumerate(products)}
+    return {position for position, product in enumerate(products)
+            if last[product["StockCode"]] != position}
+
+
+def upsert_products(collection, products):
+    """Upsert product documents by StockCode in one unordered bulk_write.
+
+    Documents missing REQUIRED_NEW_FIELDS only update an existing product,
+    so a partial row never inserts a bare one. StockCodes must be unique
+    within products, see superseded_positions().
+
+    Returns:
+        Number of documents inserted or modified
+    """
+    if not products:
+        return 0
+    requests = [
+        UpdateOne({"StockCode": product["StockCode"]}, {"$set": product}, upsert=can_create(product))
+        for product in products
+    ]
+    result = collection.bulk_write(requests, ordered=False)
+    return result.upserted_count + result.modified_count
+
+
+def import_catalog(collection, file, chunk_size=1000, usd_to_inr_rate=USD_TO_INR_RATE):
+    """Validate an uploaded CSV and upsert it by StockCode in batches.
+
+    Only IMPORT_COLUMNS are read. Each batch is one unordered bulk_write, so
+    a row rejected by the server does not stop the rest of its batch. Rows
+    without a Description or price may only update existing products; the
+    others are reported as unknown StockCodes. When a StockCode is repeated the last
+    row wins and the earlier ones are reported as duplicates. Errors are
+    reported by CSV line number (the header is line 1).
+
+    Args:
+        file: Binary or text file object, e.g. an uploaded FileStorage stream
+
+    Returns:
+        Dict with rows_read, rows_written, errors [(line, message)],
+        duplicates [(line, StockCode)], stock_codes (every StockCode sent
+        to the database) and elapsed
+    """
+    if not isinstance(file, io.TextIOBase):
+        file = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    started = time.monotonic()
+    stats = {'rows_read': 0, 'rows_written': 0, 'errors': [], 'duplicates': []}
+    # StockCode -> CSV line last written, so a later batch supersedes it
+    written = {}
+    try:
+        chunks = iter_file_chunks(file, chunk_size, usd_to_inr_rate=usd_to_inr_rate,
+                                  columns=IMPORT_COLUMNS)
+        for chunk_start, products, errors in chunks:
+            stats['rows_read'] += len(products) + len(errors)
+            stats['errors'].extend((row_number + 2, error) for row_number, error in errors)
+            # CSV line of every valid row, in batch order
+            lines = [row_number + 2 for row_number in _valid_rows(chunk_start, len(products) + len(errors), errors)]
+            superseded = superseded_positions(products)
+            if superseded:
+                stats['duplicates'].extend((lines[position], products[position]['StockCode'])
+                                           for position in superseded)
+                products, lines = _drop_positions(superseded, products, lines)
+            unknown = unknown_updates(collection, products)
+            if unknown:
+                stats['errors'].extend((lines[position], 'unknown StockCode') for position in unknown)
+                products, lines = _drop_positions(unknown, products, lines)
+            for product, line in zip(products, lines):
+                if product['StockCode'] in written:
+                    stats['duplicates'].append((written[product['StockCode']], product['StockCode']))
+                written[product['StockCode']] = line
+            stats['rows_written'] += _write_batch(collection, products, lines, stats['errors'])
+    except (UnicodeDecodeError, csv.Error) as e:
+        stats['errors'].append((None, f'unreadable CSV: {e}'))
+    stats['errors'].sort(key=lambda error: error[0] or 0)
+    stats['duplicates'].sort()
+    stats['stock_codes'] = list(written)
+    stats['elapsed'] = time.monotonic() - started
+    return stats
+
+
+def _valid_rows(chunk_start, chunk_rows, errors):
+    """Row numbers of a chunk's documents, i.e. its rows minus the invalid ones."""
+    invalid = {row_number for row_number, _ in errors}
+    return [row_number for row_number in range(chunk_start, chunk_start + chunk_rows)
+            if row_number not in invalid]
+
+
+def _drop_positions(positions, *batches):
+    return tuple([item for position, item in enumerate(batch) if position not in positions]
+                 for batch in batches)
+
+
+def _write_batch(collection, products, rows, errors):
+    """Upsert a batch, appending (row, message) to errors for every rejected document.
+
+    Returns:
+        Number of documents inserted or modified
+    """
+    try:
+        return upsert_products(collection, products)
+    except BulkWriteError as e:
+        details = e.details
+        # Map batch positions back to rows
+        for write_error in details.get('writeErrors', []):
+            errors.append((rows[write_error['index']], write_error.get('errmsg', 'write failed')))
+        return details.get('nUpserted', 0) + details.get('nModified', 0)
+
+
+def iter_catalog_csv(collection, batch_size=1000, rows_per_chunk=500):
+    """Stream catalog products as CSV text in EXPORT_COLUMNS order.
+
+    Products are read from a cursor in StockCode order and yielded in
+    chunks of ``rows_per_chunk`` rows; the output can be re-imported.
+    """
+    cursor = collection.find(
+        {"StockCode": {"$exists": True}},
+        {"_id": 0, **{column: 1 for column in EXPORT_COLUMNS}}
+    ).sort([("StockCode", 1), ("_id", 1)]).batch_size(batch_size)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    rows = 0
+    for product in cursor:
+        writer.writerow([product.get(column, '') for column in EXPORT_COLUMNS])
+        rows += 1
+        if rows % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def migrate_image_fields(collection, batch_size=1000):
+    """Backfill image_urls/primary_image on documents ingested before they existed.
+
+    Returns:
+        Number of documents updated
+    """
+    cursor = collection.find(
+        {"primary_image": {"$exists": False}, "image_url": {"$exists": True}},
+        {"image_url": 1}
+    ).batch_size(batch_size)
+
+    updated, batch = 0, []
+    for product in cursor:
+        batch.append(UpdateOne({"_id": product["_id"]}, {"$set": image_fields(product["image_url"])}))
+        if len(batch) >= batch_size:
+            updated += collection.bulk_write(batch, ordered=False).modified_count
+            batch = []
+    if batch:
+        updated += collection.bulk_write(batch, ordered=False).modified_count
+    return updated
+
+
+def remove_duplicate_stock_codes(collection):
+    """Keep only the newest document (highest _id) of every repeated StockCode.
+
+    Catalogs ingested before StockCode was unique can hold duplicates, which
+    block the stock_code_unique index.
+
+    Returns:
+        List of the StockCodes that had duplicates removed
+    """
+    groups = collection.aggregate([
+        {"$match": {"StockCode": {"$exists": True}}},
+        {"$group": {"_id": "$StockCode", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+    stock_codes = []
+    for group in groups:
+        stale = sorted(group["ids"])[:-1]
+        collection.delete_many({"_id": {"$in": stale}})
+        stock_codes.append(group["_id"])
+    return stock_codes
+
+
+def _read_checkpoint(checkpoint_path, path):
+    if not checkpoint_path or not os.path.exists(checkpoint_path):
+        return 0
+    with open(checkpoint_path, encoding='utf-8') as file:
+        checkpoint = json.load(file)
+    if checkpoint.get('path') != os.path.abspath(path):
+        return 0
+    return int(checkpoint.get('rows_done', 0))
+
+
+def _write_checkpoint(checkpoint_path, path, rows_done):
+    if not checkpoint_path:
+        return
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump({'path': os.path.abspath(path), 'rows_done': rows_done}, file)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _last_rows(path, chunk_size, skip_rows, usd_to_inr_rate):
+    """Map every StockCode to the number of its last valid row from skip_rows on."""
+    last_rows = {}
+    for chunk_start, products, errors in iter_chunks(path, chunk_size, skip_rows, usd_to_inr_rate):
+        rows = _valid_rows(chunk_start, len(products) + len(errors), errors)
+        for product, row in zip(products, rows):
+            last_rows[product['StockCode']] = row
+    return last_rows
+
+
+def ingest_catalog(collection, path, chunk_size=5000, writers=4,
+                   checkpoint_path=None, resume=False, usd_to_inr_rate=USD_TO_INR_RATE,
+                   progress_every=10):
+    """Stream a catalog CSV into Mongo with several concurrent bulk writers.
+
+    At most ``writers * 2`` chunks are held in memory at once. The checkpoint
+    records how many rows are fully written (the highest contiguous chunk), so
+    an interrupted run resumes from there; upserts make replaying safe.
+
+    Chunks are written concurrently, so a first pass over the file finds the
+    last valid row of every StockCode (holding one entry per StockCode) and
+    only that row is written; earlier ones are reported as duplicates. A
+    chunk whose bulk_write rejects documents reports them as errors and
+    the run carries on.
+
+    Returns:
+        Dict with rows read, rows written, errors [(row, message)],
+        duplicates [(row, StockCode)], elapsed seconds and rows/second
+    """
+    skip_rows = _read_checkpoint(checkpoint_path, path) if resume else 0
+    started = time.monotonic()
+    stats = {'rows_read': 0, 'rows_written': 0, 'errors': [], 'duplicates': [],
+             'resumed_from': skip_rows}
+    last_rows = _last_rows(path, chunk_size, skip_rows, usd_to_inr_rate)
+
+    # chunk start -> chunk end, for computing the contiguous checkpoint
+    pending_ranges = {}
+    done_ranges = {}
+    rows_done = skip_rows
+
+    def advance_checkpoint():
+        nonlocal rows_done
+        while rows_done in done_ranges:
+            rows_done = done_ranges.pop(rows_done)
+        _write_checkpoint(checkpoint_path, path, rows_done)
+
+    chunks_done = 0
+    with ThreadPoolExecutor(max_workers=writers, thread_name_prefix='ingest') as executor:
+        in_flight = {}
+
+        def finish(done):
+            start, write_errors = in_flight.pop(done)
+            stats['rows_written'] += done.result()
+            stats['errors'].extend(write_errors)
+            done_ranges[start] = pending_ranges.pop(start)
+
+        for chunk_start, products, errors in iter_chunks(path, chunk_size, skip_rows, usd_to_inr_rate):
+            chunk_end = chunk_start + len(products) + len(errors)
+            stats['rows_read'] += chunk_end - chunk_start
+            stats['errors'].extend(errors)
+
+            rows = _valid_rows(chunk_start, len(products) + len(errors), errors)
+            superseded = {position for position, (product, row) in enumerate(zip(products, rows))
+                          if last_rows[product['StockCode']] != row}
+            if superseded:
+                stats['duplicates'].extend((rows[position], products[position]['StockCode'])
+                                           for position in superseded)
+                products, rows = _drop_positions(superseded, products, rows)
+
+            write_errors = []
+            future = executor.submit(_write_batch, collection, products, rows, write_errors)
+            in_flight[future] = (chunk_start, write_errors)
+            pending_ranges[chunk_start] = chunk_end
+
+            # Bound memory: wait while too many chunks are queued
+            while len(in_flight) >= writers * 2:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for done in finished:
+                    finish(done)
+                    chunks_done += 1
+                    if chunks_done % progress_every == 0:
+                        elapsed = time.monotonic() - started
+                        logger.info(f"Ingested {stats['rows_read']} rows "
+                                    f"({stats['rows_read'] / elapsed:.0f} rows/s)")
+                advance_checkpoint()
+
+        for done in wait(in_flight).done:
+            finish(done)
+        advance_checkpoint()
+
+    stats['errors'].sort()
+    stats['duplicates'].sort()
+    elapsed = time.monotonic() - started
+    stats['elapsed'] = elapsed
+    stats['rows_per_second'] = stats['rows_read'] / elapsed if elapsed else 0.0
+    return stats
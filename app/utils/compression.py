@@ -0,0 +1,156 @@
+import gzip
+import threading
+import time
+import zlib
+from flask import request
+
+# Content types worth compressing; images, fonts and archives already are
+DEFAULT_MIMETYPES = (
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+)
+
+
+class ResponseCompressor:
+    """gzip HTML/JSON responses from the app's own routes.
+
+    Responses are compressed only when the client accepts gzip, the content
+    type is in the allowlist and the body is at least ``min_size`` bytes.
+    Streamed responses are compressed chunk by chunk and flushed every
+    ``stream_flush_bytes`` of input so the browser can start rendering.
+    Static files are skipped; fingerprinted ones are already precompressed.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.level = 6
+        self.min_size = 500
+        self.mimetypes = frozenset(DEFAULT_MIMETYPES)
+        self.compress_streams = True
+        self.stream_flush_bytes = 16384
+        self.skip_endpoints = {'static'}
+        self._lock = threading.Lock()
+        # endpoint -> [responses, bytes_in, bytes_out, cpu_seconds]
+        self._counts = {}
+
+    def init_app(self, app):
+        self.enabled = app.config.get('COMPRESS_RESPONSES', True)
+        self.level = int(app.config.get('COMPRESS_LEVEL', self.level))
+        self.min_size = int(app.config.get('COMPRESS_MIN_SIZE', self.min_size))
+        mimetypes = app.config.get('COMPRESS_MIMETYPES')
+        if mimetypes:
+            if isinstance(mimetypes, str):
+                mimetypes = [m.strip() for m in mimetypes.split(',') if m.strip()]
+            self.mimetypes = frozenset(mimetypes)
+        self.compress_streams = app.config.get('COMPRESS_STREAMS', self.compress_streams)
+        app.extensions['compressor'] = self
+        app.after_request(self.after_request)
+
+    def should_compress(self, response):
+        if not self.enabled or request.endpoint in self.skip_endpoints:
+            return False
+        if request.method == 'HEAD' or response.status_code < 200 or \
+                response.status_code in (204, 206, 304):
+            return False
+        if response.mimetype not in self.mimetypes:
+            return False
+        if 'Content-Encoding' in response.headers or response.direct_passthrough:
+            return False
+        if response.cache_control.no_transform:
+            return False
+        return True
+
+    def after_request(self, response):
+        if not self.should_compress(response):
+            return response
+        # Caches must keep compressed and plain copies apart
+        response.vary.add('Accept-Encoding')
+        if 'gzip' not in request.accept_encodings:
+            return response
+
+        if response.is_streamed:
+            if self.compress_streams:
+                self._compress_stream(response)
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+        started = time.thread_time()
+        compressed = gzip.compress(data, compresslevel=self.level)
+        elapsed = time.thread_time() - started
+        if len(compressed) >= len(data):
+            return response
+        response.set_data(compressed)
+        self._mark_encoded(response)
+        self._record(request.endpoint, len(data), len(compressed), elapsed)
+        return response
+
+    def _mark_encoded(self, response):
+        response.headers['Content-Encoding'] = 'gzip'
+        # The compressed body is a different representation of the same resource
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+
+    def _compress_stream(self, response):
+        source = response.response
+        chunks = response.iter_encoded()
+        endpoint = request.endpoint
+
+        def generate():
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)  # 31: gzip container
+            bytes_in = bytes_out = pending = 0
+            cpu = 0.0
+            try:
+                for chunk in chunks:
+                    started = time.thread_time()
+                    out = compressor.compress(chunk)
+                    pending += len(chunk)
+                    if pending >= self.stream_flush_bytes:
+                        out += compressor.flush(zlib.Z_SYNC_FLUSH)
+                        pending = 0
+                    cpu += time.thread_time() - started
+                    bytes_in += len(chunk)
+                    bytes_out += len(out)
+                    if out:
+                        yield out
+                started = time.thread_time()
+                out = compressor.flush()
+                cpu += time.thread_time() - started
+                bytes_out += len(out)
+                yield out
+                self._record(endpoint, bytes_in, bytes_out, cpu)
+            finally:
+                close = getattr(source, 'close', None)
+                if close is not None:
+                    close()
+
+        response.response = generate()
+        response.headers.pop('Content-Length', None)
+        self._mark_encoded(response)
+
+    def _record(self, endpoint, bytes_in, bytes_out, cpu_seconds):
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, [0, 0, 0, 0.0])
+            counts[0] += 1
+            counts[1] += bytes_in
+            counts[2] += bytes_out
+            counts[3] += cpu_seconds
+
+    def stats(self):
+        """Per-endpoint bytes before/after compression and CPU spent on it."""
+        with self._lock:
+            return {
+                endpoint: {
+                    'responses': responses,
+                    'bytes_in': bytes_in,
+                    'bytes_out': bytes_out,
+                    'ratio': bytes_out / bytes_in if bytes_in else 1.0,
+                    'cpu_ms': cpu_seconds * 1000,
+                }
+                for endpoint, (responses, bytes_in, bytes_out, cpu_seconds) in self._counts.items()
+            }
+
+
+compressor = ResponseCompressor()
@@ -0,0 +1,183 @@
+import os
+import threading
+import pymongo
+from pymongo import monitoring
+from config import Config
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Count connection pool events for the client it is registered with."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checkout_failed = 0
+        self.pools_cleared = 0
+
+    def _incr(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr('pools_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr('created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr('closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr('checkout_failed')
+
+    def connection_checked_out(self, event):
+        self._incr('checked_out')
+
+    def connection_checked_in(self, event):
+        self._incr('checked_out', -1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'open_connections': self.created - self.closed,
+                'in_use': self.checked_out,
+                'created': self.created,
+                'closed': self.closed,
+                'checkout_failed': self.checkout_failed,
+                'pools_cleared': self.pools_cleared,
+            }
+
+
+class MongoConnectionManager:
+    """Owns the process-wide MongoClient.
+
+    Settings come from Config (or app.config once init_app() has run). The
+    client is created on first use and re-created in any process whose pid
+    differs from the one that built it, so pre-forking servers never share a
+    client across workers.
+    """
+
+    def __init__(self, config=None):
+        self._settings = self._read_settings(config or vars(Config))
+        self._client = None
+        self._pid = None
+        self._stats = None
+        self._lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._forget_client)
+
+    @staticmethod
+    def _read_settings(config):
+        write_concern = str(config.get('MONGODB_WRITE_CONCERN', 1))
+        return {
+            'url': config.get('MONGODB_URL'),
+            'db_name': config.get('MONGODB_DB_NAME', 'mydatabase'),
+            'max_pool_size': int(config.get('MONGODB_MAX_POOL_SIZE', 100)),
+            'min_pool_size': int(config.get('MONGODB_MIN_POOL_SIZE', 0)),
+            'connect_timeout_ms': int(config.get('MONGODB_CONNECT_TIMEOUT_MS', 20000)),
+            'server_selection_timeout_ms': int(config.get('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 30000)),
+            'socket_timeout_ms': config.get('MONGODB_SOCKET_TIMEOUT_MS'),
+            'wait_queue_timeout_ms': config.get('MONGODB_WAIT_QUEUE_TIMEOUT_MS'),
+            'write_concern': int(write_concern) if write_concern.isdigit() else write_concern,
+            'tls_allow_invalid_certificates': bool(config.get('MONGODB_TLS_ALLOW_INVALID_CERTIFICATES', True)),
+        }
+
+    def init_app(self, app):
+        """Apply the app's configuration; the client is still built lazily."""
+        with self._lock:
+            self._settings = self._read_settings(app.config)
+            self._forget_client()
+        app.extensions['mongo'] = self
+
+    def _forget_client(self):
+        # Never close a client inherited from the parent process; just drop it
+        self._client = None
+        self._pid = None
+        self._stats = None
+
+    def _create_client(self):
+        settings = self._settings
+        self._stats = PoolStatsListener()
+        options = {
+            'maxPoolSize': settings['max_pool_size'],
+            'minPoolSize': settings['min_pool_size'],
+            'connectTimeoutMS': settings['connect_timeout_ms'],
+            'serverSelectionTimeoutMS': settings['server_selection_timeout_ms'],
+            'w': settings['write_concern'],
+            'tlsAllowInvalidCertificates': settings['tls_allow_invalid_certificates'],
+            'event_listeners': [self._stats],
+        }
+        if settings['socket_timeout_ms'] is not None:
+            options['socketTimeoutMS'] = int(settings['socket_timeout_ms'])
+        if settings['wait_queue_timeout_ms'] is not None:
+            options['waitQueueTimeoutMS'] = int(settings['wait_queue_timeout_ms'])
+        return pymongo.MongoClient(settings['url'], **options)
+
+    @property
+    def client(self):
+        """MongoClient for the current process, created on first access."""
+        pid = os.getpid()
+        if self._client is None or self._pid != pid:
+            with self._lock:
+                if self._client is None or self._pid != pid:
+                    self._client = self._create_client()
+                    self._pid = pid
+        return self._client
+
+    @property
+    def db(self):
+        return self.client[self._settings['db_name']]
+
+    def get_collection(self, name):
+        return self.db[name]
+
+    def pool_stats(self):
+        """Report pool configuration and connection counters for this process."""
+        stats = {
+            'pid': os.getpid(),
+            'connected': self._client is not None and self._pid == os.getpid(),
+            'max_pool_size': self._settings['max_pool_size'],
+            'min_pool_size': self._settings['min_pool_size'],
+        }
+        if stats['connected'] and self._stats is not None:
+            stats.update(self._stats.snapshot())
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._forget_client()
+
+
+class LazyDatabase:
+    """Stand-in for a pymongo Database that resolves through the manager."""
+
+    def __init__(self, manager):
+        self._manager = manager
+
+    def __getitem__(self, name):
+        return self._manager.get_collection(name)
+
+    def __getattr__(self, name):
+        return getattr(self._manager.db, name)
+
+
+mongo = MongoConnectionManager()
@@ -1,14 +1,27 @@
-import pymongo
-import bcrypt
-import os
-from dotenv import load_dotenv
-# Load variables from .env into the environment
-load_dotenv()
-
-# Mongo db server
-client = pymongo.MongoClient(os.getenv('mongodb_url'),
-                             tlsAllowInvalidCertificates=True)
-db = client["mydatabase"]
+import re
+from datetime import datetime, timezone
+from flask import has_request_context, request
+from bson import json_util
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.utils.db_connection import mongo, LazyDatabase
+from app.utils.search_index import product_index, tokenize
+from app.utils.suggest_index import suggest_index
+from app.utils.passwords import password_hasher, HasherBusyError
+from app.utils.cache import principal_cache, product_cache, count_cache
+from app.utils.catalog_ingest import image_fields, import_catalog, iter_catalog_csv
+from app.models.product import ProductSummary
+from app.utils.catalog_cache import CatalogCache
+from app.utils.pagination import (encode_cursor, decode_cursor, keyset_page, last_page_cursor,
+                                  sort_order, StreamedPage)
+
+# Mongo db server; the client is created lazily per process by the manager
+db = LazyDatabase(mongo)
+
+BUSY_RESULT = {
+    "success": False,
+    "message": "The server is busy. Please try again in a moment."
+}
 
 def create_user(username, password):
     """Securely registers a new user."""
@@ -19,8 +32,10 @@ def create_user(username, password):
             "message": "Username already exists"
         }
     # hasing passwords
-    salt = bcrypt.gensalt()
-    hashed_pw = bcrypt.hashpw(password.encode('utf-8'), salt)
+    try:
+        hashed_pw = password_hasher.hash(password)
+    except HasherBusyError:
+        return dict(BUSY_RESULT)
 
     # Store user in MongoDB
     result = users_col.insert_one({
@@ -45,7 +60,12 @@ def login_user(username, password):
     
     if user:
         # Verify the password against the stored hash
-        if bcrypt.checkpw(password.encode('utf-8'), user["password"]):
+        try:
+            verified = password_hasher.verify(password, user["password"])
+        except HasherBusyError:
+            return dict(BUSY_RESULT)
+        if verified:
+            _upgrade_password_hash(users_col, user, password)
             # Return user data including _id for Flask-Login
             return {
                 "success": True,
@@ -60,6 +80,20 @@ def login_user(username, password):
         "message": "Invalid username or password."
     }
 
+def _upgrade_password_hash(collection, account, password):
+    """Re-hash a verified password when the configured bcrypt cost changed."""
+    if not password_hasher.needs_rehash(account["password"]):
+        return
+    try:
+        new_hash = password_hasher.hash(password)
+    except HasherBusyError:
+        # Retry on a later login rather than failing this one
+        return
+    collection.update_one(
+        {"_id": account["_id"], "password": account["password"]},
+        {"$set": {"password": new_hash}}
+    )
+
 def get_user_by_id(user_id):
     """Fetch user by ID from MongoDB."""
     from bson import ObjectId
@@ -75,6 +109,58 @@ def get_user_by_id(user_id):
         pass
     return None
 
+# ==================== ID COUNTER FUNCTIONS ====================
+
+# Counter name -> (collection whose "id" it allocates, first id handed out)
+ID_COUNTERS = {
+    "products": ("products", 1),
+    "seller_products": ("seller_products", 101),
+}
+
+_seeded_counters = set()
+
+def _seed_counter(counter_name):
+    """Create a counter once, starting after the highest id already stored."""
+    if counter_name in _seeded_counters:
+        return
+    collection_name, first_id = ID_COUNTERS[counter_name]
+    last_product = db[collection_name].find_one(
+        {"id": {"$exists": True}}, {"id": 1}, sort=[("id", -1)]
+    )
+    seed = max(last_product["id"] if last_product else 0, first_id - 1)
+    try:
+        db["counters"].update_one(
+            {"_id": counter_name},
+            {"$setOnInsert": {"value": seed}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # Another process created the counter concurrently
+        pass
+    _seeded_counters.add(counter_name)
+
+def allocate_ids(counter_name, count=1):
+    """Atomically reserve a block of ids from the counters collection.
+
+    Args:
+        counter_name: Key of ID_COUNTERS, e.g. "products"
+        count: Number of consecutive ids to reserve in one round trip
+
+    Returns:
+        range of the reserved ids
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    _seed_counter(counter_name)
+    counter = db["counters"].find_one_and_update(
+        {"_id": counter_name},
+        {"$inc": {"value": count}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    last_id = counter["value"]
+    return range(last_id - count + 1, last_id + 1)
+
 # ==================== ADMIN/SELLER DATABASE FUNCTIONS ====================
 
 def create_admin_seller(username, password, role='seller'):
@@ -86,8 +172,10 @@ def create_admin_seller(username, password, role='seller'):
             "message": "Username already exists"
         }
     
-    salt = bcrypt.gensalt()
-    hashed_pw = bcrypt.hashpw(password.encode('utf-8'), salt)
+    try:
+        hashed_pw = password_hasher.hash(password)
+    except HasherBusyError:
+        return dict(BUSY_RESULT)
 
     result = admin_sellers_col.insert_one({
         "username": username,
@@ -110,7 +198,12 @@ def login_admin_seller(username, password):
     admin_seller = admin_sellers_col.find_one({"username": username})
     
     if admin_seller:
-        if bcrypt.checkpw(password.encode('utf-8'), admin_seller["password"]):
+        try:
+            verified = password_hasher.verify(password, admin_seller["password"])
+        except HasherBusyError:
+            return dict(BUSY_RESULT)
+        if verified:
+            _upgrade_password_hash(admin_sellers_col, admin_seller, password)
             return {
                 "success": True,
                 "admin_seller": {
@@ -137,55 +230,643 @@ def get_admin_seller_by_username(username):
         }
     return None
 
+def get_cached_admin_seller(username):
+    """Fetch an admin/seller through the per-process principal cache.
+
+    Accounts are only changed directly in MongoDB, and each worker keeps its
+    own copy, so a role change or deletion applies within PRINCIPAL_CACHE_TTL.
+    """
+    admin_seller = principal_cache.get(username)
+    if admin_seller is None:
+        admin_seller = get_admin_seller_by_username(username)
+        if admin_seller:
+            principal_cache.set(username, admin_seller)
+    return admin_seller
+
 # ==================== PRODUCT DATABASE FUNCTIONS ====================
 
-def get_products():
-    """Fetch all main products from database."""
-    products_col = db["products"]
-    products = list(products_col.find({}, {"_id": 0}))
-    return products
+# Per-view projections: each list page fetches only the fields it renders
+PRODUCT_LIST_PROJECTION = {
+    "_id": 0,
+    "StockCode": 1,
+    "Description": 1,
+    "price_inr": 1,
+    "primary_image": 1,
+    "seller": 1,
+}
+
+CART_PROJECTION = {
+    "_id": 0,
+    "StockCode": 1,
+    "Description": 1,
+    "price_inr": 1,
+}
+
+# Fields clients may request from the JSON API with ?fields=
+API_PRODUCT_FIELDS = ("StockCode", "Description", "price_inr", "primary_image", "image_urls", "seller")
+API_DEFAULT_FIELDS = ("StockCode", "Description", "price_inr", "primary_image", "seller")
+
+# _id is kept: the dashboard pages by keyset cursor
+DASHBOARD_PROJECTION = {
+    "id": 1,
+    "name": 1,
+    "price": 1,
+    "StockCode": 1,
+    "Description": 1,
+    "price_inr": 1,
+}
+
+# Listing orders for keyset pagination; each is backed by an index in db_indexes
+PRODUCT_SORT_KEYS = ["StockCode", "_id"]
+SELLER_PRODUCT_SORT_KEYS = ["id"]
+# Search index matches are paged by StockCode alone, one product per code
+INDEX_CURSOR_KEYS = ["StockCode"]
+# Admin/seller dashboard orders, selected by the ?sort= argument
+DASHBOARD_SORTS = {
+    "stock_code": PRODUCT_SORT_KEYS,
+    "name": ["Description", "_id"],
+    "price": ["price_inr", "_id"],
+}
+DASHBOARD_COUNT_MODE = 'cached'
+# Storefront grid orders, selected by the ?sort= argument
+HOME_SORTS = {
+    "featured": PRODUCT_SORT_KEYS,
+    "price_asc": ["price_inr", "_id"],
+    "price_desc": [("price_inr", -1), ("_id", -1)],
+}
+# Largest in-memory index match list pushed down as a StockCode $in filter
+MAX_INDEX_IN_CODES = 10000
+# Most StockCodes logged for one catalog version; bigger writes force index rebuilds
+CATALOG_CHANGE_LOG_LIMIT = 10000
+
+# How listing totals are computed:
+#   'exact'     - counted in the same $facet aggregation that fetches the page
+#   'estimated' - collection metadata (estimated_document_count) for unfiltered
+#                 listings, exact for filtered ones
+#   'cached'    - exact counts reused for count_cache's TTL
+LISTING_TOTAL_MODES = ('exact', 'estimated', 'cached')
+LISTING_TOTAL_MODE = 'exact'
+
+def _count_cache_key(collection, query):
+    return json_util.dumps([collection.name, query], sort_keys=True)
+
+def _listing_total(collection, query, total_mode):
+    """Return the listing total without an exact count when the mode allows it.
+
+    Returns None when the total must be counted exactly.
+    """
+    if total_mode == 'estimated' and not query:
+        return collection.estimated_document_count()
+    if total_mode == 'cached':
+        return count_cache.get(_count_cache_key(collection, query))
+    return None
+
+def _count_listing(collection, query, total_mode):
+    """Total for a listing, counting exactly only when the mode requires it."""
+    total = _listing_total(collection, query, total_mode)
+    if total is None:
+        total = collection.count_documents(query)
+        if total_mode == 'cached':
+            count_cache.set(_count_cache_key(collection, query), total)
+    return total
+
+def _facet_page(collection, query, sort_keys, per_page, page, projection, total_mode):
+    """Fetch one page and the listing total in a single round trip.
+
+    Returns:
+        (documents, total, page) with page clamped to the last page
+    """
+    total = _listing_total(collection, query, total_mode)
+    if total is not None:
+        total_pages = (total + per_page - 1) // per_page if total > 0 else 1
+        page = min(page, total_pages)
+        docs = list(
+            collection.find(query, projection)
+            .sort(sort_order(sort_keys))
+            .skip((page - 1) * per_page)
+            .limit(per_page)
+        )
+        return docs, total, page
+
+    page_stages = [{"$skip": (page - 1) * per_page}, {"$limit": per_page}]
+    if projection:
+        page_stages.append({"$project": projection})
+    pipeline = [
+        {"$match": query},
+        {"$sort": dict(sort_order(sort_keys))},
+        {"$facet": {
+            "products": page_stages,
+            "total": [{"$count": "n"}],
+        }},
+    ]
+    result = next(collection.aggregate(pipeline), {})
+    total = result["total"][0]["n"] if result.get("total") else 0
+    if total_mode == 'cached':
+        count_cache.set(_count_cache_key(collection, query), total)
+
+    total_pages = (total + per_page - 1) // per_page if total > 0 else 1
+    if page > total_pages:
+        # Requested past the end: fetch the last page instead
+        return _facet_page(collection, query, sort_keys, per_page, total_pages, projection, total_mode)
+    return result.get("products", []), total, page
+
+def _listing_page(collection, query, sort_keys, per_page, page=1, cursor=None, projection=None,
+                  with_total=False, total_mode=None):
+    """Fetch one page of a listing by page number or by keyset cursor.
 
-def get_products_paginated(page=1, per_page=10):
+    Page numbers use skip() and suit shallow pages; cursors returned for the
+    neighbouring pages cost the same at any depth. With ``with_total`` the
+    listing total is included, fetched in the same $facet round trip as a
+    page-number page.
+
+    Returns:
+        Dict with products, page (None if unknown), has_prev, has_next,
+        next_cursor and prev_cursor, plus total when requested
+    """
+    total_mode = total_mode or LISTING_TOTAL_MODE
+    # _id is needed to build cursors even when the caller excludes it
+    strip_id = projection is not None and projection.get("_id") == 0
+    fetch_projection = None
+    if projection:
+        fetch_projection = {field: value for field, value in projection.items() if field != "_id"}
+        if any(fetch_projection.values()):
+            fetch_projection["_id"] = 1
+        fetch_projection = fetch_projection or None
+    total = None
+
+    decoded = decode_cursor(cursor, sort_keys)
+    if decoded:
+        docs, has_more = keyset_page(collection, query, sort_keys, per_page, decoded, fetch_projection)
+        page = decoded.get("p")
+        if decoded["d"] == "next":
+            has_next, has_prev = has_more, decoded.get("k") is not None
+        else:
+            has_prev, has_next = has_more, decoded.get("k") is not None
+        if with_total:
+            total = _count_listing(collection, query, total_mode)
+    elif with_total:
+        docs, total, page = _facet_page(collection, query, sort_keys, per_page,
+                                        max(page, 1), fetch_projection, total_mode)
+        has_next = page * per_page < total
+        has_prev = page > 1
+    else:
+        page = max(page, 1)
+        docs = list(
+            collection.find(query, fetch_projection)
+            .sort(sort_order(sort_keys))
+            .skip((page - 1) * per_page)
+            .limit(per_page + 1)
+        )
+        has_next = len(docs) > per_page
+        docs = docs[:per_page]
+        has_prev = page > 1
+
+    next_cursor = prev_cursor = None
+    if docs and has_next:
+        next_cursor = encode_cursor(docs[-1], sort_keys, "next", page + 1 if page else None)
+    if docs and has_prev:
+        prev_cursor = encode_cursor(docs[0], sort_keys, "prev", page - 1 if page else None)
+
+    if strip_id:
+        for doc in docs:
+            doc.pop("_id", None)
+
+    result = {
+        "products": docs,
+        "page": page,
+        "has_prev": has_prev,
+        "has_next": has_next,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    }
+    if with_total:
+        result["total"] = total
+        result["total_pages"] = (total + per_page - 1) // per_page if total > 0 else 1
+    return result
+
+def get_catalog_version():
+    """Return the shared catalog version, bumped by every main catalog write."""
+    counter = db["counters"].find_one({"_id": "catalog_version"}, {"value": 1})
+    return counter["value"] if counter else 0
+
+def bump_catalog_version(stock_codes=None):
+    """Move the catalog version so every worker drops what it cached for the old one.
+
+    The StockCodes written are logged under the new version, so workers can
+    patch their search index instead of rebuilding it.
+
+    Args:
+        stock_codes: StockCodes whose search text may have changed; None
+            (or more than CATALOG_CHANGE_LOG_LIMIT) means any product may have
+    """
+    counter = db["counters"].find_one_and_update(
+        {"_id": "catalog_version"},
+        {"$inc": {"value": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    if stock_codes is not None:
+        stock_codes = sorted({str(code) for code in stock_codes if code is not None})
+        if len(stock_codes) > CATALOG_CHANGE_LOG_LIMIT:
+            stock_codes = None
+    db["catalog_changes"].insert_one({
+        "_id": counter["value"],
+        "stock_codes": stock_codes,
+        "created_at": datetime.now(timezone.utc),
+    })
+    catalog_cache.invalidate()
+    return counter["value"]
+
+def get_catalog_changes(since, version):
+    """StockCodes written after version since up to version, with their current documents.
+
+    Returns:
+        (stock_codes, product documents), or None if the change log doesn't
+        list every StockCode in that range (expired or unbounded entries)
+    """
+    entries = list(db["catalog_changes"].find({"_id": {"$gt": since, "$lte": version}}))
+    if len(entries) != version - since or any(entry["stock_codes"] is None for entry in entries):
+        return None
+    stock_codes = sorted({code for entry in entries for code in entry["stock_codes"]})
+    products = []
+    if stock_codes:
+        products = list(db["products"].find({"StockCode": {"$in": stock_codes}},
+                                            {"_id": 0, "StockCode": 1, "Description": 1, "name": 1})
+                        .sort("_id", 1))
+    return stock_codes, products
+
+# Per-process view of the catalog version, re-read at most every check interval
+catalog_cache = CatalogCache(get_catalog_version)
+
+def get_cached_catalog_version():
+    """Catalog version as seen by this worker, re-read at most every check interval."""
+    return catalog_cache.version()
+
+def get_products_paginated(page=1, per_page=10, cursor=None):
     """Fetch paginated main products from database.
     
     Args:
-        page: Page number (1-indexed)
+        page: Page number (1-indexed), used when no cursor is given
         per_page: Number of products per page
+        cursor: Opaque cursor from get_products_page()
     
     Returns:
         List of products for the specified page
     """
+    return get_products_page(page, per_page, cursor)["products"]
+
+def get_products_page(page=1, per_page=10, cursor=None, projection=None, with_total=False):
+    """Fetch a page of main products ordered by StockCode, with neighbour cursors.
+
+    With ``with_total`` the result also carries total and total_pages,
+    fetched in the same round trip (see LISTING_TOTAL_MODE).
+    """
     products_col = db["products"]
-    skip = (page - 1) * per_page
-    products = list(products_col.find({}, {"_id": 0}).skip(skip).limit(per_page))
-    return products
+    return _listing_page(products_col, {}, PRODUCT_SORT_KEYS, per_page,
+                         page, cursor, projection or {"_id": 0}, with_total)
 
 def count_products():
     """Count total number of main products in database."""
     products_col = db["products"]
     return products_col.count_documents({})
 
+def _fill_image_fields(products, fields=("primary_image",)):
+    """Derive image fields for documents not yet migrated to them.
+
+    Costs one extra query only while unmigrated documents remain
+    (see scripts/migrate_image_fields.py).
+
+    Args:
+        fields: Image fields to fill, from image_fields()
+    """
+    missing = [product["StockCode"] for product in products
+               if "StockCode" in product and any(field not in product for field in fields)]
+    if not missing:
+        return products
+    raw_images = {
+        product["StockCode"]: product.get("image_url")
+        for product in db["products"].find({"StockCode": {"$in": missing}}, {"_id": 0, "StockCode": 1, "image_url": 1})
+    }
+    for product in products:
+        if product.get("StockCode") in raw_images:
+            derived = image_fields(raw_images[product["StockCode"]])
+            for field in fields:
+                product.setdefault(field, derived[field])
+    return products
+
+def build_product_search_filter(search_query, fields=("Description", "StockCode")):
+    """Build a Mongo filter matching any of ``fields`` case-insensitively."""
+    if not search_query:
+        return {}
+    pattern = {"$regex": re.escape(search_query), "$options": "i"}
+    return {"$or": [{field: pattern} for field in fields]}
+
+def build_word_prefix_filter(search_query, fields=("Description", "StockCode")):
+    """Build a Mongo filter matching the search index: every word of the
+    query starts a word of one of ``fields``, case-insensitively."""
+    if not search_query:
+        return {}
+    words = list(dict.fromkeys(tokenize(search_query)))
+    if not words:
+        # Like the index, a query without words matches nothing
+        return {"_id": {"$in": []}}
+    # Words are alphanumeric, so they need no escaping
+    return _combine_filters(*(
+        {"$or": [{field: {"$regex": f"(^|[^a-z0-9]){word}", "$options": "i"}} for field in fields]}
+        for word in words
+    ))
+
+def build_price_filter(min_price=None, max_price=None):
+    """Build a Mongo range filter on price_inr; either bound may be None."""
+    bounds = {}
+    if min_price is not None:
+        bounds["$gte"] = min_price
+    if max_price is not None:
+        bounds["$lte"] = max_price
+    return {"price_inr": bounds} if bounds else {}
+
+def _combine_filters(*filters):
+    filters = [f for f in filters if f]
+    if len(filters) > 1:
+        return {"$and": filters}
+    return filters[0] if filters else {}
+
+def _products_in_order(stock_codes, projection):
+    """Fetch one product per StockCode, in the order of stock_codes.
+
+    A repeated StockCode is represented by its newest document, as in the
+    search index.
+    """
+    if not stock_codes:
+        return []
+    found = {
+        product["StockCode"]: product
+        for product in db["products"].find({"StockCode": {"$in": stock_codes}}, projection).sort("_id", 1)
+    }
+    return [found[code] for code in stock_codes if code in found]
+
+def _without_superseded(query):
+    """Leave out the older documents of repeated StockCodes, which searches count once."""
+    superseded = product_index.superseded
+    return _combine_filters(query, {"_id": {"$nin": superseded}}) if superseded else query
+
+def search_pages_in_memory(search_query='', min_price=None, max_price=None, sort="featured"):
+    """Whether search_products pages this search from the in-memory index.
+
+    Those pages cost the same at any depth; every other listing pages with
+    skip() up to MAX_OFFSET_PAGE and by cursor beyond it.
+    """
+    return bool(search_query) and min_price is None and max_price is None and \
+        HOME_SORTS.get(sort, PRODUCT_SORT_KEYS) is PRODUCT_SORT_KEYS and search_index_current()
+
+def search_products(search_query='', page=1, per_page=12, cursor=None,
+                    min_price=None, max_price=None, sort="featured"):
+    """Search, filter and paginate main products on the database server.
+
+    Args:
+        search_query: Words matched as prefixes of Description or StockCode words
+        page: Page number (1-indexed), clamped to the last page
+        per_page: Number of products per page
+        cursor: Opaque keyset cursor; takes precedence over page
+        min_price: Lowest price_inr to include, or None
+        max_price: Highest price_inr to include, or None
+        sort: Key of HOME_SORTS
+
+    Returns:
+        Dict with products (ProductSummary list), total, total_pages, page,
+        has_prev, has_next, next_cursor, prev_cursor and last_cursor, and
+        index_behind, true when a text search was answered by the database
+        regex because the search index was catching up
+    """
+    products_col = db["products"]
+    sort_keys = HOME_SORTS.get(sort, PRODUCT_SORT_KEYS)
+    price_filter = build_price_filter(min_price, max_price)
+
+    text_filter = build_word_prefix_filter(search_query)
+    index_behind = bool(search_query) and not search_index_current()
+    if search_query and not index_behind:
+        stock_codes = product_index.search(search_query)
+
+        # Answer plain text searches from the in-memory index. The match
+        # list is already in memory, so page slicing needs no cursor.
+        if search_pages_in_memory(search_query, min_price, max_price, sort):
+            total = len(stock_codes)
+            total_pages = (total + per_page - 1) // per_page if total > 0 else 1
+            page = min(max(page, 1), total_pages)
+
+            page_codes = stock_codes[(page - 1) * per_page:page * per_page]
+            products = _products_in_order(page_codes, PRODUCT_LIST_PROJECTION)
+            return {
+                "products": [ProductSummary.from_doc(p) for p in _fill_image_fields(products)],
+                "total": total,
+                "total_pages": total_pages,
+                "page": page,
+                "has_prev": page > 1,
+                "has_next": page < total_pages,
+                "next_cursor": None,
+                "prev_cursor": None,
+                "last_cursor": None,
+                "index_behind": False,
+            }
+
+        # Filtered or re-sorted: hand the matches to the server, which ranges
+        # and sorts them on its indexes instead of scanning with the regex
+        if len(stock_codes) <= MAX_INDEX_IN_CODES:
+            text_filter = {"StockCode": {"$in": list(stock_codes)}}
+    if search_query:
+        text_filter = _without_superseded(text_filter)
+
+    # Page and total come back from one aggregation
+    query = _combine_filters(text_filter, price_filter)
+    result = _listing_page(products_col, query, sort_keys, per_page,
+                           page, cursor, PRODUCT_LIST_PROJECTION, with_total=True)
+    result["products"] = [ProductSummary.from_doc(p) for p in _fill_image_fields(result["products"])]
+    total_pages = result["total_pages"]
+    result["last_cursor"] = last_page_cursor(total_pages, sort_keys) if total_pages > 1 else None
+    result["index_behind"] = index_behind
+    return result
+
+def _api_projection(fields):
+    # StockCode identifies every product, so it is always returned
+    return {"_id": 0, "StockCode": 1, **{field: 1 for field in fields or API_DEFAULT_FIELDS}}
+
+def _index_page(stock_codes, cursor, per_page, projection):
+    """Keyset page over the SearchMatches of the search index."""
+    decoded = decode_cursor(cursor, INDEX_CURSOR_KEYS)
+    start, end = 0, per_page
+    if decoded and decoded["k"] is not None:
+        if decoded["d"] == "next":
+            start = stock_codes.bisect_right(decoded["k"][0])
+            end = start + per_page
+        else:
+            end = stock_codes.bisect_left(decoded["k"][0])
+            start = max(end - per_page, 0)
+    page_codes = stock_codes[start:end]
+    has_prev = start > 0 and bool(page_codes)
+    has_next = end < len(stock_codes)
+    return {
+        "products": _products_in_order(page_codes, projection),
+        "page": None,
+        "has_prev": has_prev,
+        "has_next": has_next,
+        "next_cursor": encode_cursor({"StockCode": page_codes[-1]}, INDEX_CURSOR_KEYS, "next") if has_next else None,
+        "prev_cursor": encode_cursor({"StockCode": page_codes[0]}, INDEX_CURSOR_KEYS, "prev") if has_prev else None,
+    }
+
+def get_products_api_page(search_query='', cursor=None, per_page=24, fields=None):
+    """Fetch one keyset page of main products with only the requested fields.
+
+    Searches are matched by the in-memory index, like search_products(), and
+    paged over its sorted StockCode list; the database regex is only used
+    while the index is behind the catalog. Both page searches by StockCode
+    alone, so their cursors are interchangeable.
+
+    Args:
+        search_query: Words to match against Description or StockCode
+        cursor: Opaque cursor from a previous page's next_cursor/prev_cursor
+        per_page: Number of products per page
+        fields: Subset of API_PRODUCT_FIELDS, defaults to API_DEFAULT_FIELDS
+
+    Returns:
+        Dict with products, has_prev, has_next, next_cursor and prev_cursor
+
+    Raises:
+        ValueError: if the cursor is malformed or was issued for another listing
+    """
+    sort_keys = INDEX_CURSOR_KEYS if search_query else PRODUCT_SORT_KEYS
+    if cursor and decode_cursor(cursor, sort_keys) is None:
+        raise ValueError("invalid cursor")
+
+    projection = _api_projection(fields)
+    if search_query and search_index_current():
+        result = _index_page(product_index.search(search_query), cursor, per_page, projection)
+    else:
+        # Searches count each StockCode once, so StockCode alone orders them
+        query = _without_superseded(build_word_prefix_filter(search_query)) if search_query else {}
+        result = _listing_page(db["products"], query,
+                               sort_keys, per_page, cursor=cursor, projection=projection)
+    image_fields_requested = [field for field in ("primary_image", "image_urls") if field in projection]
+    if image_fields_requested:
+        _fill_image_fields(result["products"], image_fields_requested)
+    return result
+
+def get_product_api_fields(product_id, fields=None):
+    """Return the requested fields of one main product, or None if it doesn't exist."""
+    product = get_product_by_id(product_id)
+    if product is None:
+        return None
+    fields = _api_projection(fields)
+    if ("primary_image" in fields or "image_urls" in fields) and "primary_image" not in product:
+        product = {**product, **image_fields(product.get("image_url"))}
+    return {field: product.get(field) for field in fields if field != "_id"}
+
+def _dashboard_filter(search_query):
+    # Products added from the dashboard carry name instead of Description
+    return build_product_search_filter(search_query, ("Description", "StockCode", "name"))
+
+def stream_dashboard_products(search_query='', sort='stock_code', cursor=None, per_page=50):
+    """Return one dashboard page that yields products as they are fetched.
+
+    Args:
+        search_query: Substring to match against Description, StockCode or name
+        sort: Key of DASHBOARD_SORTS
+        cursor: Opaque keyset cursor from a previous page's next/prev_cursor
+        per_page: Number of products per page
+
+    Returns:
+        StreamedPage; its navigation cursors are set once it has been iterated
+    """
+    sort_keys = DASHBOARD_SORTS.get(sort, PRODUCT_SORT_KEYS)
+    return StreamedPage(db["products"], _dashboard_filter(search_query), sort_keys,
+                        per_page, decode_cursor(cursor, sort_keys), DASHBOARD_PROJECTION)
+
+def count_dashboard_products(search_query=''):
+    """Count products matching the dashboard filter, reusing recent counts."""
+    return _count_listing(db["products"], _dashboard_filter(search_query), DASHBOARD_COUNT_MODE)
+
+def get_product_search_documents():
+    """Stream the fields the search index needs for every main product."""
+    products_col = db["products"]
+    return products_col.find({}, {"_id": 1, "StockCode": 1, "Description": 1, "name": 1})
+
+def refresh_search_index(background=True):
+    """Bring the search index up to the catalog version, from the change log if possible."""
+    product_index.refresh(get_cached_catalog_version(), get_product_search_documents,
+                          get_catalog_changes, background)
+
+def search_index_current():
+    """Whether the search index reflects the catalog version this worker sees.
+
+    Logged changes are applied on the spot. If the log can't cover the gap
+    the index is rebuilt in the background, and callers answer searches from
+    the database until it finishes.
+    """
+    refresh_search_index()
+    return product_index.is_current(get_cached_catalog_version())
+
+def get_suggest_documents():
+    """Stream the fields the suggestion index needs for every main product."""
+    products_col = db["products"]
+    return products_col.find({}, {"_id": 0, "StockCode": 1, "Description": 1, "name": 1, "popularity": 1})
+
+def refresh_suggest_index(background=True):
+    """Rebuild the suggestion index if the catalog version has moved."""
+    suggest_index.refresh(get_cached_catalog_version(), get_suggest_documents, background)
+
+def suggest_products(search_query, limit=8):
+    """Typeahead suggestions for a partial query, most popular first.
+
+    Returns:
+        List of {StockCode, Description} dicts
+    """
+    refresh_suggest_index()
+    return suggest_index.suggest(search_query, limit)
+
+def record_sales(items):
+    """Add sold quantities to each product's popularity, used to rank suggestions.
+
+    Popularity is not part of the catalog version, so recording sales
+    does not invalidate any cache.
+
+    Args:
+        items: Dict mapping StockCode to quantity sold
+    """
+    requests = [
+        UpdateOne({"StockCode": str(stock_code)}, {"$inc": {"popularity": int(quantity)}})
+        for stock_code, quantity in items.items() if quantity > 0
+    ]
+    if requests:
+        db["products"].bulk_write(requests, ordered=False)
+
 def get_seller_products(seller_username):
     """Fetch products for a specific seller."""
     seller_products_col = db["seller_products"]
     products = list(seller_products_col.find({"seller": seller_username}, {"_id": 0}))
     return products
 
-def get_seller_products_paginated(seller_username, page=1, per_page=10):
+def get_seller_products_paginated(seller_username, page=1, per_page=10, cursor=None):
     """Fetch paginated seller products from database.
     
     Args:
         seller_username: The seller's username
-        page: Page number (1-indexed)
+        page: Page number (1-indexed), used when no cursor is given
         per_page: Number of products per page
+        cursor: Opaque cursor from get_seller_products_page()
     
     Returns:
         List of products for the specified page
     """
+    return get_seller_products_page(seller_username, page, per_page, cursor)["products"]
+
+def get_seller_products_page(seller_username, page=1, per_page=10, cursor=None, with_total=False):
+    """Fetch a page of a seller's products ordered by id, with neighbour cursors.
+
+    With ``with_total`` the result also carries total and total_pages,
+    replacing a separate count_seller_products() call.
+    """
     seller_products_col = db["seller_products"]
-    skip = (page - 1) * per_page
-    products = list(seller_products_col.find({"seller": seller_username}, {"_id": 0}).skip(skip).limit(per_page))
-    return products
+    return _listing_page(seller_products_col, {"seller": seller_username},
+                         SELLER_PRODUCT_SORT_KEYS, per_page, page, cursor, {"_id": 0}, with_total)
 
 def count_seller_products(seller_username):
     """Count total number of seller products in database."""
@@ -196,8 +877,7 @@ def add_product(name, price):
     """Add a new main product to database."""
     products_col = db["products"]
     # Get next product ID
-    last_product = products_col.find_one(sort=[("id", -1)])
-    next_id = (last_product["id"] + 1) if last_product else 1
+    next_id = allocate_ids("products")[0]
 
     product = {
         "id": next_id,
@@ -205,14 +885,15 @@ def add_product(name, price):
         "price": float(price)
     }
     products_col.insert_one(product)
+    invalidate_product(product.get("StockCode"))
+    bump_catalog_version([product.get("StockCode")])
     return product
 
 def add_seller_product(seller_username, name, price):
     """Add a new seller product to database."""
     seller_products_col = db["seller_products"]
     # Get next seller product ID
-    last_product = seller_products_col.find_one(sort=[("id", -1)])
-    next_id = (last_product["id"] + 1) if last_product else 101
+    next_id = allocate_ids("seller_products")[0]
 
     product = {
         "id": next_id,
@@ -226,11 +907,16 @@ def add_seller_product(seller_username, name, price):
 def update_product(product_id, name, price):
     """Update a main product in database."""
     products_col = db["products"]
-    result = products_col.update_one(
+    product = products_col.find_one_and_update(
         {"id": product_id},
-        {"$set": {"name": name, "price": float(price)}}
+        {"$set": {"name": name, "price": float(price)}},
+        projection={"_id": 0, "StockCode": 1, "Description": 1, "name": 1},
+        return_document=ReturnDocument.AFTER
     )
-    return result.modified_count > 0
+    if product:
+        invalidate_product(product.get("StockCode"))
+        bump_catalog_version([product.get("StockCode")])
+    return product is not None
 
 def update_seller_product(seller_username, product_id, name, price):
     """Update a seller product in database."""
@@ -244,8 +930,14 @@ def update_seller_product(seller_username, product_id, name, price):
 def delete_product(product_id):
     """Delete a main product from database."""
     products_col = db["products"]
-    result = products_col.delete_one({"id": product_id})
-    return result.deleted_count > 0
+    product = products_col.find_one_and_delete(
+        {"id": product_id},
+        projection={"_id": 0, "StockCode": 1}
+    )
+    if product:
+        invalidate_product(product.get("StockCode"))
+        bump_catalog_version([product.get("StockCode")])
+    return product is not None
 
 def delete_seller_product(seller_username, product_id):
     """Delete a seller product from database."""
@@ -253,16 +945,81 @@ def delete_seller_product(seller_username, product_id):
     result = seller_products_col.delete_one({"id": product_id, "seller": seller_username})
     return result.deleted_count > 0
 
+def import_products_csv(file, chunk_size=1000):
+    """Upsert main products from an uploaded CSV, see catalog_ingest.import_catalog().
+
+    Returns:
+        Dict with rows_read, rows_written, errors [(line, message)],
+        duplicates [(line, StockCode)] and elapsed
+    """
+    stats = import_catalog(db["products"], file, chunk_size)
+    stock_codes = stats.pop("stock_codes")
+    if stats["rows_written"]:
+        # Entries of the old version are unreachable after the bump; free them now
+        product_cache.clear()
+        # Workers patch their search index from the logged StockCodes, or
+        # rebuild it in the background when there are too many
+        bump_catalog_version(stock_codes)
+    return stats
+
+def export_products_csv():
+    """Stream the main catalog as CSV text chunks from a database cursor."""
+    return iter_catalog_csv(db["products"])
+
+# Cached marker for StockCodes that do not exist
+_PRODUCT_NOT_FOUND = object()
+
+# Seconds a miss is remembered; short so new products appear quickly
+PRODUCT_NOT_FOUND_TTL = 10
+
 def get_product_by_id(product_id):
-    """Get a main product by ID."""
+    """Get a main product by StockCode through the read-through product cache.
+
+    Entries are keyed by catalog version as well, so once any worker writes
+    to the catalog this one stops serving what it cached before; anything
+    tagged with the new version (e.g. an API ETag) never labels stale data.
+    Misses are cached too, so repeated lookups of nonexistent StockCodes
+    don't reach Mongo. Hits and misses are counted per request endpoint.
+    """
+    stock_code = str(product_id)
+    key = (get_cached_catalog_version(), stock_code)
+    label = request.endpoint if has_request_context() else None
+    product = product_cache.get(key, label=label)
+    if product is _PRODUCT_NOT_FOUND:
+        return None
+    if product is None:
+        products_col = db["products"]
+        product = products_col.find_one({"StockCode": stock_code}, {"_id": 0})
+        if product is None:
+            product_cache.set(key, _PRODUCT_NOT_FOUND, ttl=PRODUCT_NOT_FOUND_TTL)
+            return None
+        product_cache.set(key, product)
+    # Callers get their own copy so they can't alter the cached document
+    return dict(product)
+
+def invalidate_product(stock_code):
+    """Drop a product (or its cached miss) from the product cache.
+
+    Entries from older catalog versions are never read again and age out.
+    """
+    if stock_code is not None:
+        product_cache.invalidate((get_cached_catalog_version(), str(stock_code)))
+
+def get_products_by_ids(product_ids):
+    """Get main products for many StockCodes in a single query.
+
+    Args:
+        product_ids: Iterable of StockCodes
+
+    Returns:
+        Dict mapping StockCode to ProductSummary; missing products are absent
+    """
+    stock_codes = list({str(product_id) for product_id in product_ids})
+    if not stock_codes:
+        return {}
     products_col = db["products"]
-    # Search by id field (integer)
-    try:
-        product = products_col.find_one({"StockCode": str(product_id)})
-        return product
-    except (ValueError, TypeError):
-        # If conversion fails, try as string
-        return products_col.find_one({"StockCode": str(product_id)}, {"_id": 0})
+    products = products_col.find({"StockCode": {"$in": stock_codes}}, CART_PROJECTION)
+    return {product["StockCode"]: ProductSummary.from_doc(product) for product in products}
 
 def get_seller_product_by_id(seller_username, product_id):
     """Get a seller product by ID."""
@@ -0,0 +1,159 @@
+import pymongo
+
+# Index declarations for every collection queried by db_helper.
+# Each entry lists the index keys, creation options and the db_helper
+# functions whose queries the index serves.
+INDEX_SPECS = {
+    "users": [
+        {
+            "keys": [("username", pymongo.ASCENDING)],
+            "options": {"name": "username_unique", "unique": True},
+            "covers": ["create_user", "login_user"],
+        },
+    ],
+    "admin_sellers": [
+        {
+            "keys": [("username", pymongo.ASCENDING)],
+            "options": {"name": "username_unique", "unique": True},
+            "covers": ["create_admin_seller", "login_admin_seller",
+                       "get_admin_seller_by_username"],
+        },
+    ],
+    "products": [
+        {
+            # One product per StockCode; products added from the dashboard
+            # have none, hence the partial filter. Existing duplicates block
+            # it until scripts/dedupe_stock_codes.py has run.
+            "keys": [("StockCode", pymongo.ASCENDING)],
+            "options": {"name": "stock_code_unique", "unique": True,
+                        "partialFilterExpression": {"StockCode": {"$exists": True}}},
+            "covers": ["upsert_products", "import_products_csv"],
+        },
+        {
+            # _id breaks StockCode ties left in catalogs not yet deduplicated
+            # for keyset pagination; the prefix serves StockCode lookups.
+            # Trailing price_inr lets price bands on the default order be
+            # filtered from the index keys (equality, sort, range).
+            "keys": [("StockCode", pymongo.ASCENDING), ("_id", pymongo.ASCENDING),
+                     ("price_inr", pymongo.ASCENDING)],
+            "options": {"name": "stock_code_id_price"},
+            "covers": ["get_product_by_id", "get_products_by_ids", "search_products",
+                       "get_products_page", "stream_dashboard_products"],
+        },
+        {
+            "keys": [("Description", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)],
+            "options": {"name": "description_id"},
+            "covers": ["stream_dashboard_products (sort=name)"],
+        },
+        {
+            "keys": [("price_inr", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)],
+            # Read forwards or backwards for either price order; a price band
+            # is a range scan on the same keys
+            "options": {"name": "price_inr_id"},
+            "covers": ["stream_dashboard_products (sort=price)",
+                       "search_products (sort=price_asc/price_desc, min_price/max_price)"],
+        },
+        {
+            # Catalog rows imported from CSV have no "id", hence sparse
+            "keys": [("id", pymongo.ASCENDING)],
+            "options": {"name": "id_unique", "unique": True, "sparse": True},
+            "covers": ["update_product", "delete_product", "allocate_ids"],
+        },
+    ],
+    "seller_products": [
+        {
+            "keys": [("seller", pymongo.ASCENDING), ("id", pymongo.ASCENDING)],
+            "options": {"name": "seller_id_unique", "unique": True},
+            "covers": ["get_seller_products", "get_seller_products_page",
+                       "count_seller_products", "update_seller_product",
+                       "delete_seller_product", "get_seller_product_by_id"],
+        },
+        {
+            "keys": [("id", pymongo.DESCENDING)],
+            "options": {"name": "id_desc"},
+            "covers": ["allocate_ids"],
+        },
+    ],
+    "catalog_changes": [
+        {
+            # Workers further behind than a day rebuild their search index instead
+            "keys": [("created_at", pymongo.ASCENDING)],
+            "options": {"name": "created_at_ttl", "expireAfterSeconds": 24 * 3600},
+            "covers": ["bump_catalog_version (expiry)"],
+        },
+    ],
+    "carts": [
+        {
+            # Abandoned carts expire 30 days after their last change
+            "keys": [("updated_at", pymongo.ASCENDING)],
+            "options": {"name": "updated_at_ttl", "expireAfterSeconds": 30 * 24 * 3600},
+            "covers": ["MongoCartStore (expiry)"],
+        },
+    ],
+}
+
+# Indexes superseded by a wider one in INDEX_SPECS, dropped by ensure_indexes
+RETIRED_INDEXES = {
+    "products": ["stock_code_id"],
+}
+
+
+def ensure_indexes(db, specs=None, retired=None):
+    """Create every declared index and drop retired ones; safe to run repeatedly.
+
+    Args:
+        db: pymongo Database to provision
+        specs: Index declarations, defaults to INDEX_SPECS
+        retired: {collection: [index name]} to drop, defaults to RETIRED_INDEXES
+
+    Returns:
+        List of report dicts with collection, index name, covered queries
+        and either "ok" or the error message as status
+    """
+    specs = INDEX_SPECS if specs is None else specs
+    report = []
+    for collection_name, indexes in specs.items():
+        collection = db[collection_name]
+        for spec in indexes:
+            entry = {
+                "collection": collection_name,
+                "index": spec["options"]["name"],
+                "covers": spec["covers"],
+            }
+            try:
+                collection.create_index(spec["keys"], **spec["options"])
+                entry["status"] = "ok"
+            except pymongo.errors.PyMongoError as e:
+                # e.g. existing duplicates block a unique index
+                entry["status"] = str(e)
+            report.append(entry)
+
+    retired = RETIRED_INDEXES if retired is None else retired
+    for collection_name, names in retired.items():
+        collection = db[collection_name]
+        try:
+            existing = collection.index_information()
+        except pymongo.errors.PyMongoError:
+            continue
+        for name in names:
+            if name not in existing:
+                continue
+            entry = {"collection": collection_name, "index": name, "covers": ["retired"]}
+            try:
+                collection.drop_index(name)
+                entry["status"] = "dropped"
+            except pymongo.errors.PyMongoError as e:
+                entry["status"] = str(e)
+            report.append(entry)
+    return report
+
+
+def format_report(report):
+    """Render an ensure_indexes() report as printable lines."""
+    lines = []
+    for entry in report:
+        lines.append(
+            f"{entry['collection']}.{entry['index']}: {entry['status']} "
+            f"(covers {', '.join(entry['covers'])})"
+        )
+    return lines
@@ -0,0 +1,67 @@
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used without it
+    orjson = None
+
+
+class CatalogJSONProvider(DefaultJSONProvider):
+    """Flask's default JSON provider that also understands ObjectId."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, ObjectId):
+            return str(o)
+        return DefaultJSONProvider.default(o)
+
+
+class OrjsonProvider(CatalogJSONProvider):
+    """JSON provider backed by orjson, several times faster on large lists.
+
+    Keys are not sorted and output is compact unless the app is in debug
+    mode, where responses are indented like Flask's default provider.
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        if kwargs.get('sort_keys'):
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_NON_STR_KEYS
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype
+        )
+
+
+JSON_PROVIDERS = {
+    'default': CatalogJSONProvider,
+    'orjson': OrjsonProvider,
+}
+
+
+def init_app(app):
+    """Install the provider named by app.config['JSON_PROVIDER'].
+
+    'auto' picks orjson when it is installed and falls back to the default.
+    """
+    name = app.config.get('JSON_PROVIDER', 'auto')
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'default'
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"JSON_PROVIDER must be one of {sorted(JSON_PROVIDERS)} or 'auto'")
+    if name == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_PROVIDER is 'orjson' but orjson is not installed")
+    app.json = JSON_PROVIDERS[name](app)
@@ -0,0 +1,194 @@
+import base64
+import binascii
+import zlib
+from bson import json_util
+
+# Pages reachable by page number; deeper pages are only served by cursor
+MAX_OFFSET_PAGE = 20
+
+
+def sort_spec(sort_keys):
+    """Normalise sort keys to (field, direction) pairs.
+
+    A key is either a field name, sorted ascending, or a (field, 1 | -1) pair.
+    """
+    return [(key, 1) if isinstance(key, str) else (key[0], key[1]) for key in sort_keys]
+
+
+def sort_order(sort_keys, order=1):
+    """Arguments for cursor.sort(); order=-1 reads the listing backwards."""
+    return [(field, direction * order) for field, direction in sort_spec(sort_keys)]
+
+
+def sort_signature(sort_keys):
+    """Short checksum of a sort order, so cursors can't be replayed under another."""
+    spec = ','.join(f'{field}:{direction}' for field, direction in sort_spec(sort_keys))
+    return zlib.crc32(spec.encode('utf-8'))
+
+
+def encode_cursor(doc, sort_keys, direction, page=None):
+    """Build an opaque cursor pointing just past ``doc`` in ``direction``.
+
+    Args:
+        doc: Boundary document holding every field in sort_keys
+        sort_keys: Sort keys the listing is ordered by, see sort_spec()
+        direction: 'next' for the page after doc, 'prev' for the page before it
+        page: Page number the cursor leads to, carried for display only
+    """
+    payload = {
+        'k': [doc.get(field) for field, _ in sort_spec(sort_keys)] if doc is not None else None,
+        'd': direction,
+        'p': page,
+        's': sort_signature(sort_keys),
+    }
+    raw = json_util.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def last_page_cursor(page=None, sort_keys=()):
+    """Cursor for the final page, read backwards from the end of the listing."""
+    return encode_cursor(None, sort_keys, 'prev', page)
+
+
+def decode_cursor(token, sort_keys):
+    """Decode a cursor, returning None if it is malformed or for another sort."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json_util.loads(raw.decode('utf-8'))
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        return None
+    if not isinstance(payload, dict) or payload.get('d') not in ('next', 'prev'):
+        return None
+    keys = payload.get('k')
+    if keys is not None and (not isinstance(keys, list) or len(keys) != len(sort_keys)):
+        return None
+    # Cursors issued before signatures existed carry none
+    if payload.get('s') is not None and payload['s'] != sort_signature(sort_keys):
+        return None
+    return payload
+
+
+def keyset_filter(sort_keys, values, direction):
+    """Mongo filter selecting documents strictly after/before ``values``.
+
+    Expands to the lexicographic comparison
+    (a > x) or (a == x and b > y) or ... where > follows each key's own
+    direction. Missing fields sort as null, below every other value, so a
+    null bound matches "not null" when looking for larger values and nothing
+    when looking for smaller ones, while a non-null bound looking for
+    smaller values also takes the nulls.
+    """
+    forward = direction == 'next'
+    clauses = []
+    spec = sort_spec(sort_keys)
+    for i, (field, field_direction) in enumerate(spec):
+        op = '$gt' if forward == (field_direction == 1) else '$lt'
+        if values[i] is None and op == '$lt':
+            continue
+        clause = {prev_field: values[j] for j, (prev_field, _) in enumerate(spec[:i])}
+        if values[i] is None:
+            clause[field] = {'$ne': None}
+        elif op == '$lt' and field != '_id':
+            # $lt never matches null, yet nulls are the smallest values
+            clause['$or'] = [{field: {op: values[i]}}, {field: None}]
+        else:
+            clause[field] = {op: values[i]}
+        clauses.append(clause)
+    if not clauses:
+        return {'_id': {'$in': []}}
+    return clauses[0] if len(clauses) == 1 else {'$or': clauses}
+
+
+def _bounded_query(query, sort_keys, cursor):
+    """Combine ``query`` with the keyset bound carried by ``cursor``."""
+    if not cursor or cursor.get('k') is None:
+        return query
+    bound = keyset_filter(sort_keys, cursor['k'], cursor['d'])
+    return {'$and': [query, bound]} if query else bound
+
+
+def keyset_page(collection, query, sort_keys, per_page, cursor=None, projection=None):
+    """Fetch one page ordered by ``sort_keys`` without skip().
+
+    Cost depends only on per_page, however deep the page is, provided an
+    index covers ``query`` plus ``sort_keys``.
+
+    Returns:
+        (documents, has_more) where has_more says whether more documents
+        exist beyond the page in the cursor's direction
+    """
+    direction = cursor['d'] if cursor else 'next'
+    query = _bounded_query(query, sort_keys, cursor)
+    order = 1 if direction == 'next' else -1
+    docs = list(
+        collection.find(query, projection)
+        .sort(sort_order(sort_keys, order))
+        .limit(per_page + 1)
+    )
+    has_more = len(docs) > per_page
+    docs = docs[:per_page]
+    if direction == 'prev':
+        docs.reverse()
+    return docs, has_more
+
+
+class StreamedPage:
+    """One keyset page iterated straight off a Mongo cursor.
+
+    Rows are yielded as the driver returns them, so a streamed template can
+    send the first rows before the last ones are fetched. has_next,
+    next_cursor and the other navigation attributes are only filled in once
+    iteration has finished, i.e. below the rows in the template.
+    """
+
+    def __init__(self, collection, query, sort_keys, per_page, cursor=None, projection=None):
+        self.collection = collection
+        self.query = query
+        self.sort_keys = sort_keys
+        self.per_page = per_page
+        self.cursor = cursor
+        self.projection = projection
+        self.page = cursor.get('p') if cursor else 1
+        self.count = 0
+        self.has_prev = self.has_next = False
+        self.prev_cursor = self.next_cursor = None
+
+    def __iter__(self):
+        direction = self.cursor['d'] if self.cursor else 'next'
+        query = _bounded_query(self.query, self.sort_keys, self.cursor)
+        order = 1 if direction == 'next' else -1
+        docs = (
+            self.collection.find(query, self.projection)
+            .sort(sort_order(self.sort_keys, order))
+            .limit(self.per_page + 1)
+        )
+        if direction == 'prev':
+            # Read backwards, so the page has to be buffered and reversed
+            docs = list(docs)
+            has_more = len(docs) > self.per_page
+            docs = docs[:self.per_page][::-1]
+            self.has_prev, self.has_next = has_more, self.cursor.get('k') is not None
+        else:
+            has_more = False
+            self.has_prev = bool(self.cursor and self.cursor.get('k') is not None)
+
+        first = last = None
+        for doc in docs:
+            if direction == 'next' and self.count == self.per_page:
+                has_more = True
+                break
+            if first is None:
+                first = doc
+            last = doc
+            self.count += 1
+            yield doc
+
+        if direction == 'next':
+            self.has_next = has_more
+        page = self.page
+        if last is not None and self.has_next:
+            self.next_cursor = encode_cursor(last, self.sort_keys, 'next', page + 1 if page else None)
+        if first is not None and self.has_prev:
+            self.prev_cursor = encode_cursor(first, self.sort_keys, 'prev', page - 1 if page else None)
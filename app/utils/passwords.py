@@ -0,0 +1,85 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import bcrypt
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing queue is full and the request should fail fast."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded worker pool instead of the request thread.
+
+    bcrypt releases the GIL while hashing, so a small pool keeps login storms
+    from pinning every request worker. At most ``max_workers + max_queue``
+    operations may be in flight; beyond that callers get HasherBusyError.
+    """
+
+    def __init__(self, rounds=12, max_workers=4, max_queue=32, timeout=10):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = None
+        self._pid = None
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Read BCRYPT_ROUNDS and the PASSWORD_HASH_* settings from app.config."""
+        with self._lock:
+            self.rounds = int(app.config.get('BCRYPT_ROUNDS', self.rounds))
+            self.max_workers = int(app.config.get('PASSWORD_HASH_WORKERS', self.max_workers))
+            self.max_queue = int(app.config.get('PASSWORD_HASH_MAX_QUEUE', self.max_queue))
+            self.timeout = float(app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout))
+            self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+            self._executor = None
+            self._pid = None
+
+    def _get_executor(self):
+        # Worker threads do not survive fork, so build a pool per process
+        pid = os.getpid()
+        if self._executor is None or self._pid != pid:
+            with self._lock:
+                if self._executor is None or self._pid != pid:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='bcrypt'
+                    )
+                    self._pid = pid
+        return self._executor
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusyError('Password hashing queue is full')
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HasherBusyError('Password hashing timed out')
+
+    def hash(self, password):
+        """Hash a password with the configured cost factor."""
+        return self._run(
+            lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+        )
+
+    def verify(self, password, hashed_pw):
+        """Check a password against a stored bcrypt hash."""
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), hashed_pw)
+
+    def needs_rehash(self, hashed_pw):
+        """True when a stored hash was made with a different cost factor."""
+        try:
+            return int(hashed_pw.split(b'$')[2]) != self.rounds
+        except (IndexError, ValueError, AttributeError):
+            return True
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,390 @@
+import logging
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from heapq import merge
+from itertools import groupby, islice
+from operator import itemgetter
+
+logger = logging.getLogger('flask-ecommerce')
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Offsets of the set bits of every byte value, to turn bitmaps back into positions
+BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def tokenize(text):
+    """Split text into lowercase alphanumeric tokens."""
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+
+def positions_to_bits(positions, size):
+    """Return a bitmap (an int) with the given bit positions set."""
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def iter_bits(bits, start=0):
+    """Yield the positions of the set bits at or above start, ascending."""
+    bits >>= start
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for index, value in enumerate(data):
+        if value:
+            base = start + index * 8
+            for bit in BYTE_BITS[value]:
+                yield base + bit
+
+
+class SearchMatches(Sequence):
+    """StockCodes matching a query, in StockCode order.
+
+    Matches are a bitmap over the index's product numbers plus the sorted
+    StockCodes matched in its overlay. len() is a popcount and only the
+    positions read are turned into StockCodes, so a page out of a large
+    match set costs the page. bisect_left()/bisect_right() locate a
+    StockCode without reading the matches before it.
+    """
+
+    def __init__(self, codes=(), bits=0, extra=()):
+        self._codes = codes
+        self._bits = bits
+        self._extra = extra
+        self._size = bits.bit_count() + len(extra)
+
+    def __len__(self):
+        return self._size
+
+    def _rank(self, position):
+        """Number of bitmap matches below product number position."""
+        return (self._bits & ((1 << position) - 1)).bit_count()
+
+    def _base_codes(self, start, stop):
+        """StockCodes of the bitmap matches start..stop."""
+        if start >= stop:
+            return []
+        first = 0
+        if start:
+            # Product number of the start-th match: the lowest position with rank start + 1
+            lo, hi = 0, self._bits.bit_length()
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self._rank(mid + 1) > start:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            first = lo
+        return [self._codes[position] for position in islice(iter_bits(self._bits, first), stop - start)]
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            if item < 0:
+                item += self._size
+            if not 0 <= item < self._size:
+                raise IndexError('match index out of range')
+            return self[item:item + 1][0]
+        start, stop, step = item.indices(self._size)
+        if step != 1:
+            return list(self)[item]
+        if not self._extra:
+            return self._base_codes(start, stop)
+        # Overlay matches are few; merge them into the first stop matches
+        return list(islice(merge(self._base_codes(0, stop), self._extra), start, stop))
+
+    def __iter__(self):
+        codes = self._codes
+        return merge((codes[position] for position in iter_bits(self._bits)), self._extra)
+
+    def bisect_left(self, stock_code):
+        """Number of matches ordered before stock_code."""
+        return self._rank(bisect_left(self._codes, stock_code)) + bisect_left(self._extra, stock_code)
+
+    def bisect_right(self, stock_code):
+        """Number of matches ordered before or at stock_code."""
+        return self._rank(bisect_right(self._codes, stock_code)) + bisect_right(self._extra, stock_code)
+
+
+class SearchIndex:
+    """In-process inverted index from Description/StockCode words to StockCodes.
+
+    Products are numbered in StockCode order and each query word is answered
+    with a bitmap of product numbers, so matching every word is an AND and
+    matches come out in StockCode order without sorting. Words are kept in
+    one sorted list with packed postings: the words sharing a prefix are a
+    contiguous range found with bisect. Prefixes whose postings cover at
+    least ``dense_fraction`` of the catalog keep their bitmap, as they are
+    too wide to merge per query; rarer ones are merged on demand.
+
+    Each StockCode is indexed once, from its newest document (highest _id);
+    ``superseded`` lists the _ids of its older ones, for database queries
+    that must count the same documents.
+
+    ``version`` is the catalog version the index reflects. Changed products
+    are applied as a small overlay (apply()) that masks their old entries;
+    once it grows past ``compact_threshold`` the index is rebuilt in the
+    background while the current one keeps answering.
+    """
+
+    def __init__(self, dense_fraction=1 / 16, compact_threshold=500):
+        self.dense_fraction = dense_fraction
+        self.compact_threshold = compact_threshold
+        self.version = None
+        self.superseded = []
+        self._state = None
+        self._building = False
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._state is not None
+
+    def _build_state(self, products):
+        """Build the lookup tables from (StockCode, _id, text) triples."""
+        codes = []
+        postings = {}
+        superseded = []
+        for number, (stock_code, rows) in enumerate(groupby(sorted(products, key=itemgetter(0)),
+                                                           key=itemgetter(0))):
+            codes.append(stock_code)
+            rows = list(rows)
+            if len(rows) > 1:
+                rows.sort(key=lambda row: (row[1] is not None, row[1]))
+                superseded.extend(row[1] for row in rows[:-1] if row[1] is not None)
+            words = set(tokenize(stock_code))
+            words.update(tokenize(rows[-1][2]))
+            for word in words:
+                posting = postings.get(word)
+                if posting is None:
+                    postings[word] = posting = array('I')
+                posting.append(number)
+
+        # Postings are packed into one array; word i owns offsets[i]:offsets[i + 1]
+        words = sorted(postings)
+        offsets = array('I', [0])
+        packed = array('I')
+        for word in words:
+            packed.extend(postings.pop(word))
+            offsets.append(len(packed))
+
+        return {
+            'codes': codes,
+            'words': words,
+            'offsets': offsets,
+            'postings': packed,
+            'dense': self._dense_prefixes(words, offsets, packed, len(codes)),
+            'superseded': superseded,
+            # Overlay: bitmap of changed product numbers, their current words by
+            # StockCode, and the same as sorted (word, StockCode) pairs
+            'masked': 0,
+            'changed': {},
+            'changed_words': [],
+        }
+
+    def _dense_prefixes(self, words, offsets, packed, size):
+        """Return the bitmaps of the prefixes with enough postings.
+
+        A prefix's range holds those of its extensions, so only extensions
+        of dense prefixes are candidates. Longer prefixes are built first,
+        so a shorter one ORs in its dense one-character extensions and
+        reads the postings of the remaining words only.
+        """
+        threshold = max(int(size * self.dense_fraction), 1)
+        ranges = {}
+        candidates = [('', 0, len(words))]
+        while candidates:
+            prefix, lo, hi = candidates.pop()
+            length = len(prefix) + 1
+            word = lo
+            while word < hi:
+                extension = words[word][:length]
+                if len(extension) < length:
+                    word += 1
+                    continue
+                end = bisect_left(words, extension + '\uffff', word, hi)
+                if offsets[end] - offsets[word] >= threshold:
+                    ranges[extension] = (word, end)
+                    candidates.append((extension, word, end))
+                word = end
+
+        dense = {}
+        for prefix in sorted(ranges, key=len, reverse=True):
+            lo, hi = ranges[prefix]
+            bits = 0
+            loose = []
+            word = lo
+            while word < hi:
+                extension = words[word][:len(prefix) + 1]
+                if extension in dense and extension != prefix:
+                    bits |= dense[extension]
+                    word = ranges[extension][1]
+                else:
+                    loose.append(packed[offsets[word]:offsets[word + 1]])
+                    word += 1
+            dense[prefix] = bits | positions_to_bits(
+                (number for posting in loose for number in posting), size)
+        return dense
+
+    def build(self, products, version=None):
+        """Rebuild the index from an iterable of product documents."""
+        state = self._build_state([
+            (stock_code, product.get('_id'), product_text(product))
+            for product in products
+            for stock_code in [product_key(product)] if stock_code is not None
+        ])
+        with self._lock:
+            self._state = state
+            self.superseded = state.pop('superseded')
+            self.version = version
+
+    def apply(self, version, stock_codes, products):
+        """Bring the index to version by re-reading the given StockCodes.
+
+        Args:
+            version: Catalog version after the changes
+            stock_codes: Every StockCode written since the index's version
+            products: Current documents for those StockCodes in _id order;
+                absent ones were deleted
+        """
+        words_by_code = {str(stock_code): set() for stock_code in stock_codes}
+        for product in products:
+            stock_code = product_key(product)
+            if stock_code in words_by_code:
+                # The newest document of a StockCode comes last and wins
+                words_by_code[stock_code] = {*tokenize(product_text(product)), *tokenize(stock_code)}
+
+        with self._lock:
+            state = self._state
+            if state is None or (self.version is not None and version <= self.version):
+                return
+            codes = state['codes']
+            masked = state['masked']
+            changed = dict(state['changed'])
+            for stock_code, words in words_by_code.items():
+                number = bisect_left(codes, stock_code)
+                if number < len(codes) and codes[number] == stock_code:
+                    masked |= 1 << number
+                if words:
+                    changed[stock_code] = frozenset(words)
+                else:
+                    changed.pop(stock_code, None)
+            changed_words = sorted((word, stock_code) for stock_code, words in changed.items() for word in words)
+            # Readers take the state without the lock, so it is replaced, never mutated
+            self._state = {**state, 'masked': masked, 'changed': changed, 'changed_words': changed_words}
+            self.version = version
+
+    def is_current(self, version):
+        return self.ready and self.version == version
+
+    def needs_compaction(self):
+        state = self._state
+        return state is not None and len(state['changed']) > self.compact_threshold
+
+    def refresh(self, version, loader, changes_loader=None, background=True):
+        """Bring the index up to the catalog version.
+
+        Changes listed by changes_loader(since, version), which returns
+        (stock_codes, products) or None if it can't cover the range, are
+        applied in place. Otherwise, or once the overlay is too large, the
+        index is rebuilt from loader(): on a background thread once an
+        index exists, so the old one keeps answering until it is swapped in.
+        """
+        if self.ready and self.version is not None and changes_loader is not None and \
+                version > self.version:
+            changes = changes_loader(self.version, version)
+            if changes is not None:
+                self.apply(version, *changes)
+        if self.is_current(version) and not self.needs_compaction():
+            return
+
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+        if background and self.ready:
+            threading.Thread(target=self._rebuild, args=(version, loader),
+                             name='search-index', daemon=True).start()
+        else:
+            self._rebuild(version, loader)
+
+    def _rebuild(self, version, loader):
+        try:
+            self.build(loader(), version)
+        except Exception as e:
+            logger.error(f"Search index build failed: {e}")
+        finally:
+            self._building = False
+
+    def _prefix_bits(self, state, prefix):
+        bits = state['dense'].get(prefix)
+        if bits is not None:
+            return bits
+        words = state['words']
+        lo = bisect_left(words, prefix)
+        hi = bisect_left(words, prefix + '\uffff', lo)
+        offsets = state['offsets']
+        return positions_to_bits(state['postings'][offsets[lo]:offsets[hi]], len(state['codes']))
+
+    def search(self, query):
+        """Return the StockCodes matching every word of the query as prefixes.
+
+        Returns:
+            SearchMatches in StockCode order
+        """
+        state = self._state
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if state is None or not tokens:
+            return SearchMatches()
+
+        bits = -1
+        for token in tokens:
+            bits &= self._prefix_bits(state, token)
+            if not bits:
+                break
+        bits &= ~state['masked']
+
+        extra = None
+        changed_words = state['changed_words']
+        for token in tokens:
+            lo = bisect_left(changed_words, (token,))
+            hi = bisect_left(changed_words, (token + '\uffff',), lo)
+            found = {stock_code for _, stock_code in changed_words[lo:hi]}
+            extra = found if extra is None else extra & found
+            if not extra:
+                break
+        return SearchMatches(state['codes'], bits, sorted(extra))
+
+    def stats(self):
+        state = self._state
+        return {
+            'version': self.version,
+            'products': len(self),
+            'words': len(state['words']) if state else 0,
+            'dense_prefixes': len(state['dense']) if state else 0,
+            'overlay': len(state['changed']) if state else 0,
+        }
+
+    def __len__(self):
+        state = self._state
+        if state is None:
+            return 0
+        return len(state['codes']) - state['masked'].bit_count() + len(state['changed'])
+
+
+def product_key(product):
+    """Return the StockCode a product is indexed under, if it has one."""
+    stock_code = product.get('StockCode') if product else None
+    return str(stock_code) if stock_code is not None else None
+
+
+def product_text(product):
+    """Return the searchable text of a product document."""
+    return product.get('Description') or product.get('name') or ''
+
+
+product_index = SearchIndex()
@@ -0,0 +1,233 @@
+import logging
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from heapq import nsmallest
+from itertools import groupby
+
+from app.utils.search_index import tokenize, product_key, product_text
+
+logger = logging.getLogger('flask-ecommerce')
+
+
+class SuggestIndex:
+    """Typeahead index over Description tokens and StockCodes.
+
+    Products are numbered in popularity order (most popular first), so the
+    best matches for a term are simply its smallest product numbers. Terms
+    are kept in one sorted list, which acts as a flattened prefix trie: the
+    terms sharing a prefix form a contiguous range found with bisect. The
+    top products of every prefix up to ``precomputed_length`` characters
+    are stored outright, because those ranges are too wide to scan per
+    keystroke; longer prefixes cover few terms and are merged on demand.
+
+    The index is immutable once built and replaced wholesale by refresh(),
+    so lookups take no lock.
+    """
+
+    def __init__(self, pool_size=64, precomputed_length=3, memory_budget_mb=256, max_age=900):
+        # Products kept per term/prefix; enough to filter multi-word queries
+        self.pool_size = pool_size
+        self.precomputed_length = precomputed_length
+        self.memory_budget_mb = memory_budget_mb
+        self.max_age = max_age
+        self.version = None
+        self.built_at = None
+        self.build_seconds = None
+        self.estimated_bytes = 0
+        self.dropped_products = 0
+        self._state = None
+        self._building = False
+        self._lock = threading.Lock()
+
+    def configure(self, memory_budget_mb=None, max_age=None):
+        if memory_budget_mb is not None:
+            self.memory_budget_mb = float(memory_budget_mb)
+        if max_age is not None:
+            self.max_age = float(max_age)
+
+    @property
+    def ready(self):
+        return self._state is not None
+
+    def _build_state(self, products):
+        """Build the lookup tables for products already in popularity order."""
+        codes, labels = [], []
+        postings = {}
+        for number, (stock_code, label) in enumerate(products):
+            codes.append(stock_code)
+            labels.append(label)
+            for term in set(tokenize(label) + tokenize(stock_code)):
+                posting = postings.get(term)
+                if posting is None:
+                    postings[term] = posting = array('I')
+                # Products arrive most popular first, so the first pool_size are the top ones
+                if len(posting) < self.pool_size:
+                    posting.append(number)
+
+        # Postings are packed into one array; term i owns offsets[i]:offsets[i + 1]
+        terms = sorted(postings)
+        offsets = array('I', [0])
+        packed = array('I')
+        for term in terms:
+            packed.extend(postings.pop(term))
+            offsets.append(len(packed))
+
+        # Top products for every short prefix. Terms are sorted, so a
+        # prefix's terms, and therefore its postings, are one contiguous run.
+        prefix_top = {}
+        for length in range(1, self.precomputed_length + 1):
+            start = 0
+            for prefix, group in groupby(terms, key=lambda term: term[:length]):
+                end = start + sum(1 for _ in group)
+                if len(prefix) == length:
+                    merged = set(packed[offsets[start]:offsets[end]])
+                    prefix_top[prefix] = array('I', nsmallest(self.pool_size, merged))
+                start = end
+
+        return {
+            'codes': codes,
+            'labels': labels,
+            'terms': terms,
+            'offsets': offsets,
+            'postings': packed,
+            'prefix_top': prefix_top,
+        }
+
+    @staticmethod
+    def estimate_bytes(state):
+        """Approximate heap size of a built index."""
+        size = sum(sys.getsizeof(state[key]) for key in ('codes', 'labels', 'terms', 'offsets',
+                                                            'postings', 'prefix_top'))
+        size += sum(sys.getsizeof(code) for code in state['codes'])
+        size += sum(sys.getsizeof(label) for label in state['labels'])
+        size += sum(sys.getsizeof(term) for term in state['terms'])
+        size += sum(sys.getsizeof(prefix) + sys.getsizeof(top) for prefix, top in state['prefix_top'].items())
+        return size
+
+    def build(self, documents, version=None):
+        """Rebuild the index from product documents carrying an optional popularity.
+
+        If the result exceeds memory_budget_mb, it is rebuilt from only the
+        most popular products that fit, and the shortfall is logged.
+        """
+        started = time.monotonic()
+        products = []
+        for doc in documents:
+            stock_code = product_key(doc)
+            if stock_code is not None:
+                products.append((-(doc.get('popularity') or 0), stock_code, product_text(doc).strip()))
+        products.sort()
+        ranked = [(stock_code, label) for _, stock_code, label in products]
+        del products
+
+        state = self._build_state(ranked)
+        estimated = self.estimate_bytes(state)
+        budget = self.memory_budget_mb * 1024 * 1024
+        dropped = 0
+        if budget and estimated > budget and ranked:
+            keep = int(len(ranked) * budget / estimated * 0.9)
+            dropped = len(ranked) - keep
+            logger.warning(f"Suggest index needs ~{estimated / 1024 / 1024:.0f} MiB, over the "
+                           f"{self.memory_budget_mb:.0f} MiB budget; indexing the {keep} most "
+                           f"popular of {len(ranked)} products")
+            state = self._build_state(ranked[:keep])
+            estimated = self.estimate_bytes(state)
+
+        with self._lock:
+            self._state = state
+            self.version = version
+            self.built_at = time.monotonic()
+            self.build_seconds = time.monotonic() - started
+            self.estimated_bytes = estimated
+            self.dropped_products = dropped
+
+    def is_stale(self, version):
+        if self._state is None or version != self.version:
+            return True
+        return bool(self.max_age) and time.monotonic() - self.built_at > self.max_age
+
+    def refresh(self, version, loader, background=True):
+        """Rebuild from loader() if the catalog version moved or the index aged out.
+
+        Once an index exists, rebuilds run on a background thread and the
+        old index keeps answering until the new one is swapped in.
+        """
+        with self._lock:
+            if self._building or not self.is_stale(version):
+                return
+            self._building = True
+        if background and self._state is not None:
+            threading.Thread(target=self._rebuild, args=(version, loader),
+                             name='suggest-index', daemon=True).start()
+        else:
+            self._rebuild(version, loader)
+
+    def _rebuild(self, version, loader):
+        try:
+            self.build(loader(), version)
+        except Exception as e:
+            logger.error(f"Suggest index build failed: {e}")
+        finally:
+            self._building = False
+
+    def _candidates(self, state, prefix):
+        """Product numbers whose terms start with prefix, most popular first."""
+        if len(prefix) <= self.precomputed_length:
+            return state['prefix_top'].get(prefix, ())
+        terms = state['terms']
+        lo = bisect_left(terms, prefix)
+        hi = bisect_left(terms, prefix + '\uffff', lo)
+        offsets = state['offsets']
+        postings = state['postings'][offsets[lo]:offsets[hi]]
+        if hi - lo == 1:
+            return postings
+        return nsmallest(self.pool_size, set(postings))
+
+    def suggest(self, query, limit=8):
+        """Return up to limit {'StockCode', 'Description'} dicts for a partial query.
+
+        Every word of the query must prefix some word of the product. The
+        word matching the fewest products drives the lookup and the others
+        are checked against its candidates.
+        """
+        state = self._state
+        words = list(dict.fromkeys(tokenize(query)))
+        if state is None or not words:
+            return []
+        candidates = {word: self._candidates(state, word) for word in words}
+        driver = min(words, key=lambda word: len(candidates[word]))
+        # A word prefixes a token when no letter or digit precedes it
+        word_patterns = [re.compile(r'(?<![a-z0-9])' + re.escape(word)) for word in words if word != driver]
+        results = []
+        for number in candidates[driver]:
+            label = state['labels'][number]
+            if word_patterns:
+                text = f"{label} {state['codes'][number]}".lower()
+                if not all(pattern.search(text) for pattern in word_patterns):
+                    continue
+            results.append({'StockCode': state['codes'][number], 'Description': label})
+            if len(results) >= limit:
+                break
+        return results
+
+    def stats(self):
+        state = self._state
+        return {
+            'version': self.version,
+            'products': len(state['codes']) if state else 0,
+            'terms': len(state['terms']) if state else 0,
+            'estimated_mb': self.estimated_bytes / 1024 / 1024,
+            'memory_budget_mb': self.memory_budget_mb,
+            'dropped_products': self.dropped_products,
+            'build_seconds': self.build_seconds,
+        }
+
+    def __len__(self):
+        return len(self._state['codes']) if self._state else 0
+
+
+suggest_index = SuggestIndex()
@@ -1,5 +1,9 @@
 import logging
+import re
+import uuid
 from flask import session
+from flask_login import current_user
+from app.utils.cart_store import get_cart_store
 
 # Set up logging
 logger = logging.getLogger('flask-ecommerce')
@@ -9,57 +13,104 @@ formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
+CART_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# Namespace of the cart IDs derived from user IDs
+CART_ID_NAMESPACE = uuid.UUID('5d0f6c1e-8a52-4c1b-9f3e-2b7a6d4c8e10')
+
+
+def _validate_cart(cart):
+    """Return a copy of cart with string keys, positive int values and sorted keys"""
+    cleaned_cart = {}
+    for k, v in cart.items():
+        try:
+            # Skip if key or value is None
+            if k is None or v is None:
+                continue
+
+            # Keep keys as strings, convert values to int
+            key = str(k) if isinstance(k, (int, str)) else None
+            value = int(v) if isinstance(v, (int, str)) else None
+
+            if key is not None and value is not None and value > 0:
+                cleaned_cart[key] = value
+        except (ValueError, TypeError):
+            continue  # Skip invalid entries
+
+    # Sort keys to ensure consistent ordering (prevents comparison issues)
+    return {k: cleaned_cart[k] for k in sorted(cleaned_cart.keys())}
+
+def user_cart_id(user_id):
+    """Return the cart ID of a user.
+
+    It is derived from the user ID rather than stored in the session, so
+    concurrent first requests of a login all address the same cart.
+    """
+    return uuid.uuid5(CART_ID_NAMESPACE, str(user_id)).hex
+
+def get_cart_id(create=False):
+    """Return the cart ID of the logged-in user, else the session's, optionally creating one"""
+    if current_user.is_authenticated:
+        return user_cart_id(current_user.get_id())
+    cart_id = session.get('cart_id')
+    if cart_id is None and create:
+        cart_id = uuid.uuid4().hex
+        session['cart_id'] = cart_id
+    return cart_id
+
+def get_cart():
+    """Load the current cart from the server-side cart store"""
+    cart_id = get_cart_id()
+    if cart_id is None:
+        return {}
+    return get_cart_store().get(cart_id)
+
+def add_to_cart(product_id, quantity=1):
+    """Atomically add an item to the current cart"""
+    return get_cart_store().add_item(get_cart_id(create=True), str(product_id), quantity)
+
+def set_cart_item(product_id, quantity):
+    """Set an item's quantity in the current cart; zero removes it"""
+    cart_id = get_cart_id(create=quantity > 0)
+    if cart_id is None:
+        return {}
+    return get_cart_store().set_item(cart_id, str(product_id), quantity)
+
+def clear_cart():
+    """Empty the current cart"""
+    cart_id = get_cart_id()
+    session.pop('cart_id', None)
+    if cart_id is not None:
+        get_cart_store().clear(cart_id)
 
 def clean_cart_session():
-    """Clean and validate cart data in session to prevent serialization errors"""
+    """Clean the cart reference in the session
+
+    The cart itself lives in the cart store under the user's cart ID, so
+    this only touches the database once per session left by an earlier
+    version: carts kept in the cookie, or in the store under a random ID
+    carried by the cookie, are moved into the user's cart.
+    """
     try:
-        cart = session.get('cart', {})
-        
-        # If cart doesn't exist or is empty, initialize it
-        if not cart:
-            session['cart'] = {}
-            session.modified = True
-            return {}
-        
-        # If not a dict, reset to empty
-        if not isinstance(cart, dict):
-            session['cart'] = {}
-            session.modified = True
-            return {}
-        
-        # Clean up cart data - keep keys as strings, ensure values are strictly integers
-        cleaned_cart = {}
-        for k, v in cart.items():
-            try:
-                # Skip if key or value is None
-                if k is None or v is None:
-                    continue
-
-                # Keep keys as strings, convert values to int
-                key = str(k) if isinstance(k, (int, str)) else None
-                value = int(v) if isinstance(v, (int, str)) else None
-
-                if key is not None and value is not None and value > 0:
-                    cleaned_cart[key] = value
-            except (ValueError, TypeError):
-                continue  # Skip invalid entries
-        
-        # Sort keys to ensure consistent ordering (prevents comparison issues)
-        sorted_cart = {k: cleaned_cart[k] for k in sorted(cleaned_cart.keys())}
-        
-        # Only update session if we made changes
-        if sorted_cart != cart:
-            session['cart'] = sorted_cart
-            session.modified = True
-        
-        return sorted_cart
-        
+        cart_id = session.get('cart_id')
+        if cart_id is not None and (not isinstance(cart_id, str) or not CART_ID_PATTERN.match(cart_id)):
+            session.pop('cart_id', None)
+        elif cart_id is not None and current_user.is_authenticated:
+            session.pop('cart_id')
+            # take() is atomic, so concurrent requests can't move the items twice
+            for product_id, quantity in get_cart_store().take(cart_id).items():
+                add_to_cart(product_id, quantity)
+
+        if 'cart' in session:
+            legacy_cart = session.pop('cart')
+            session.pop('cart_version', None)
+            session.pop('cart_validated', None)
+            if isinstance(legacy_cart, dict):
+                for product_id, quantity in _validate_cart(legacy_cart).items():
+                    add_to_cart(product_id, quantity)
     except Exception as e:
         logger.error(f"Cart cleaning error: {e}")
-        # Only reset cart if there's a serious error, not just data type issues
-        session['cart'] = {}
-        session.modified = True
-        return {}
+        session.pop('cart', None)
+        session.pop('cart_id', None)
 
 def clean_buy_now_session():
     """Clean and validate buy-now item in session"""
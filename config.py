@@ -1,5 +1,59 @@
 import os
+from dotenv import load_dotenv
+
+# Load variables from .env into the environment
+load_dotenv()
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-here')
-    MONGODB_URL = os.environ.get('MONGODB_URL', 'mongodb://localhost:27017/shop_smart')
+    # `mongodb_url` is the name documented in the README's .env example
+    MONGODB_URL = os.environ.get('MONGODB_URL') or os.environ.get('mongodb_url') or 'mongodb://localhost:27017/shop_smart'
+    MONGODB_DB_NAME = os.environ.get('MONGODB_DB_NAME', 'mydatabase')
+    # Connection pool and timeout tuning (see app/utils/db_connection.py)
+    MONGODB_MAX_POOL_SIZE = int(os.environ.get('MONGODB_MAX_POOL_SIZE', 100))
+    MONGODB_MIN_POOL_SIZE = int(os.environ.get('MONGODB_MIN_POOL_SIZE', 0))
+    MONGODB_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGODB_CONNECT_TIMEOUT_MS', 20000))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 30000))
+    MONGODB_SOCKET_TIMEOUT_MS = os.environ.get('MONGODB_SOCKET_TIMEOUT_MS')
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS = os.environ.get('MONGODB_WAIT_QUEUE_TIMEOUT_MS')
+    MONGODB_WRITE_CONCERN = os.environ.get('MONGODB_WRITE_CONCERN', '1')
+    MONGODB_TLS_ALLOW_INVALID_CERTIFICATES = os.environ.get('MONGODB_TLS_ALLOW_INVALID_CERTIFICATES', 'true').lower() == 'true'
+    # Run idempotent index provisioning (app/utils/db_indexes.py) in create_app()
+    CREATE_INDEXES_ON_STARTUP = os.environ.get('CREATE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+    # bcrypt cost factor; stored hashes are upgraded on the next successful login
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    # Bounded bcrypt worker pool (see app/utils/passwords.py)
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 32))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+    # Per-process cache of admin/seller principals used by load_user(); a role
+    # change or deletion reaches every worker within the TTL
+    PRINCIPAL_CACHE_SIZE = int(os.environ.get('PRINCIPAL_CACHE_SIZE', 1024))
+    PRINCIPAL_CACHE_TTL = float(os.environ.get('PRINCIPAL_CACHE_TTL', 60))
+    # Server-side cart backend: 'mongo' or 'memory' (tests/single process)
+    CART_STORE = os.environ.get('CART_STORE', 'mongo')
+    # How often a worker re-reads the shared catalog version its caches are keyed on
+    CATALOG_VERSION_CHECK_SECONDS = float(os.environ.get('CATALOG_VERSION_CHECK_SECONDS', 1))
+    # Read-through cache for single-product lookups (db_helper.get_product_by_id)
+    PRODUCT_CACHE_SIZE = int(os.environ.get('PRODUCT_CACHE_SIZE', 10000))
+    PRODUCT_CACHE_TTL = float(os.environ.get('PRODUCT_CACHE_TTL', 60))
+    PRODUCT_CACHE_NEGATIVE_TTL = float(os.environ.get('PRODUCT_CACHE_NEGATIVE_TTL', 10))
+    # Listing totals: 'exact' ($facet with the page), 'estimated' or 'cached'
+    LISTING_TOTAL_MODE = os.environ.get('LISTING_TOTAL_MODE', 'exact')
+    LISTING_COUNT_CACHE_TTL = float(os.environ.get('LISTING_COUNT_CACHE_TTL', 60))
+    # Identifies the deployed code (e.g. the git commit) in page ETags
+    BUILD_ID = os.environ.get('BUILD_ID', '')
+    # Serve static files through static/build/manifest.json (scripts/build_assets.py)
+    FINGERPRINT_STATIC_ASSETS = os.environ.get('FINGERPRINT_STATIC_ASSETS', 'true').lower() == 'true'
+    # gzip for HTML/JSON responses (see app/utils/compression.py)
+    COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', 'true').lower() == 'true'
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    # Comma-separated content types; empty keeps the built-in allowlist
+    COMPRESS_MIMETYPES = os.environ.get('COMPRESS_MIMETYPES', '')
+    COMPRESS_STREAMS = os.environ.get('COMPRESS_STREAMS', 'true').lower() == 'true'
+    # JSON encoder for API responses: 'auto' (orjson if installed), 'orjson' or 'default'
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    # Typeahead index (app/utils/suggest_index.py): heap budget and forced refresh age
+    SUGGEST_MEMORY_BUDGET_MB = float(os.environ.get('SUGGEST_MEMORY_BUDGET_MB', 256))
+    SUGGEST_MAX_AGE_SECONDS = float(os.environ.get('SUGGEST_MAX_AGE_SECONDS', 900))
@@ -0,0 +1,67 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+# Allow running as `python scripts/benchmark_api.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.utils import json_provider
+
+DEFAULT_ROUTES = [
+    ('HTML home', '/'),
+    ('HTML search', '/?q=christmas'),
+    ('API list', '/api/v1/products?limit=12'),
+    ('API search', '/api/v1/products?limit=12&q=christmas'),
+    ('API list, 2 fields', '/api/v1/products?limit=12&fields=Description,price_inr'),
+    ('API list, 100 items', '/api/v1/products?limit=100'),
+]
+
+def time_route(client, path, repeat):
+    """Return (ms per request, body bytes, gzipped bytes) for an uncached path."""
+    client.get(path)  # warm caches and connections
+    started = time.perf_counter()
+    for _ in range(repeat):
+        response = client.get(path, headers={'Accept-Encoding': 'identity'})
+    elapsed = time.perf_counter() - started
+    body = response.get_data()
+    return elapsed * 1000 / repeat, len(body), len(gzip.compress(body))
+
+def run(repeat, encode_repeat):
+    app = create_app()
+    client = app.test_client()
+
+    print(f"{'route':<22} {'ms/req':>8} {'bytes':>9} {'gzip':>8}")
+    for label, path in DEFAULT_ROUTES:
+        ms, raw, packed = time_route(client, path, repeat)
+        print(f"{label:<22} {ms:>8.2f} {raw:>9} {packed:>8}")
+
+    # 304s for clients that already hold the current catalog version
+    path = DEFAULT_ROUTES[2][1]
+    etag = client.get(path).headers['ETag']
+    started = time.perf_counter()
+    for _ in range(repeat):
+        client.get(path, headers={'If-None-Match': etag})
+    print(f"{'API list, 304':<22} {(time.perf_counter() - started) * 1000 / repeat:>8.2f} {0:>9} {0:>8}")
+
+    payload = json.loads(client.get('/api/v1/products?limit=100').get_data())
+    print(f"\nSerialising a 100-product page ({app.json.__class__.__name__} is active):")
+    for name, provider_class in json_provider.JSON_PROVIDERS.items():
+        if name == 'orjson' and json_provider.orjson is None:
+            print("  orjson         not installed")
+            continue
+        provider = provider_class(app)
+        started = time.perf_counter()
+        for _ in range(encode_repeat):
+            provider.dumps(payload)
+        print(f"  {name:<14} {(time.perf_counter() - started) * 1e6 / encode_repeat:8.1f} µs")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare the JSON catalog API with the HTML home route.')
+    parser.add_argument('--repeat', type=int, default=200, help='requests per route')
+    parser.add_argument('--encode-repeat', type=int, default=2000, help='serialisations per encoder')
+    args = parser.parse_args()
+    run(args.repeat, args.encode_repeat)
@@ -0,0 +1,65 @@
+import argparse
+import os
+import sys
+import time
+import zlib
+
+# Allow running as `python scripts/benchmark_compression.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+
+DEFAULT_PATHS = ['/', '/?page=2', '/?q=christmas']
+
+def login(client, path, username, password):
+    response = client.post(path, data={'username': username, 'password': password})
+    if response.status_code not in (200, 302):
+        print(f"Login to {path} as {username} failed ({response.status_code})")
+
+def gzip_cost(data, level, repeat):
+    """Return (compressed size, CPU milliseconds per response) at level."""
+    started = time.process_time()
+    for _ in range(repeat):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        size = len(compressor.compress(data) + compressor.flush())
+    return size, (time.process_time() - started) * 1000 / repeat
+
+def run(paths, levels, repeat, user=None, admin=None):
+    app = create_app()
+    client = app.test_client()
+    if user:
+        login(client, '/login', *user)
+    if admin:
+        login(client, '/admin_seller/login', *admin)
+
+    print(f"{'route':<32} {'raw':>10} " + ' '.join(f"{f'gzip-{level}':>18}" for level in levels))
+    for path in paths:
+        # No Accept-Encoding, so the middleware leaves the body alone
+        data = client.get(path, headers={'Accept-Encoding': 'identity'}).get_data()
+        cells = []
+        for level in levels:
+            size, cpu_ms = gzip_cost(data, level, repeat)
+            saved = 1 - size / len(data) if data else 0
+            cells.append(f"{size:>8} {saved:>4.0%} {cpu_ms:>4.1f}ms")
+        print(f"{path:<32} {len(data):>10} " + ' '.join(f"{cell:>18}" for cell in cells))
+
+    # Sanity check that the middleware itself compresses these routes
+    from app.utils.compression import compressor
+    for path in paths:
+        client.get(path, headers={'Accept-Encoding': 'gzip'})
+    print("\nMiddleware totals per endpoint:")
+    for endpoint, stats in sorted(compressor.stats().items()):
+        print(f"  {endpoint:<30} {stats['responses']:>4} responses  {stats['bytes_in']:>10} -> "
+              f"{stats['bytes_out']:>9} bytes ({1 - stats['ratio']:.0%} saved)  {stats['cpu_ms']:.1f}ms CPU")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure bytes saved against CPU spent by gzip per route.')
+    parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 6, 9])
+    parser.add_argument('--repeat', type=int, default=20, help='compressions per measurement')
+    parser.add_argument('--user', nargs=2, metavar=('USERNAME', 'PASSWORD'),
+                        help='log in as a customer first, e.g. to measure /cart')
+    parser.add_argument('--admin', nargs=2, metavar=('USERNAME', 'PASSWORD'),
+                        help='log in as an admin/seller first, e.g. to measure /admin_seller/dashboard')
+    args = parser.parse_args()
+    run(args.paths, args.levels, args.repeat, args.user, args.admin)
@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+import tracemalloc
+
+# Allow running as `python scripts/benchmark_product_memory.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.product import ProductSummary
+from app.utils.catalog_ingest import image_fields
+
+def make_document(n):
+    """A product document shaped like one ingested from data/products.csv."""
+    image_urls = [f'https://m.media-amazon.com/images/I/{n:07d}{i}fghiJ._AC_UL320_.jpg' for i in range(10)]
+    return {
+        'StockCode': f'{85000 + n}',
+        'Description': f'15CM CHRISTMAS GLASS BALL 20 LIGHTS {n}',
+        'price_inr': 667 + n % 500,
+        'image_url': str(image_urls),
+        **image_fields(image_urls),
+    }
+
+def measure(label, build, count):
+    tracemalloc.start()
+    items = build(count)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {current / 1024 / 1024:8.1f} MiB  ({current / count:6.0f} B/product, peak {peak / 1024 / 1024:.1f} MiB)")
+    del items
+    return current
+
+def full_documents(count):
+    return [make_document(n) for n in range(count)]
+
+def projected_documents(count):
+    return [{
+        'StockCode': doc['StockCode'],
+        'Description': doc['Description'],
+        'price_inr': doc['price_inr'],
+        'primary_image': doc['primary_image'],
+    } for doc in map(make_document, range(count))]
+
+def summaries(count):
+    return [ProductSummary.from_doc(doc) for doc in map(make_document, range(count))]
+
+def run(count):
+    print(f"Holding {count} products in memory:")
+    full = measure('raw Mongo dicts', full_documents, count)
+    projected = measure('projected dicts', projected_documents, count)
+    slotted = measure('ProductSummary (__slots__)', summaries, count)
+    print(f"Projection saves {1 - projected / full:.0%}, summaries save {1 - slotted / full:.0%} over raw dicts.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compare memory of product representations.')
+    parser.add_argument('--count', type=int, default=100_000)
+    run(parser.parse_args().count)
@@ -0,0 +1,72 @@
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Allow running as `python scripts/benchmark_search.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.search_index import SearchIndex
+from scripts.benchmark_suggest import WORDS, make_documents, percentile
+
+def run(count, queries, per_page, changes):
+    # Tracing slows the build down several times, so it is timed untraced
+    index = SearchIndex()
+    started = time.perf_counter()
+    index.build(make_documents(count), version=0)
+    build_seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    traced = SearchIndex()
+    traced.build(make_documents(count), version=0)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+
+    stats = index.stats()
+    print(f"Indexed {stats['products']} products, {stats['words']} words in {build_seconds:.1f}s")
+    print(f"Traced {current / 1024 / 1024:.0f} MiB, build peak {peak / 1024 / 1024:.0f} MiB")
+
+    rng = random.Random(2)
+    samples = []
+    for _ in range(queries):
+        word = rng.choice(WORDS)
+        kind = rng.random()
+        if kind < 0.4:
+            query = word[:rng.randint(1, len(word))]
+        elif kind < 0.7:
+            query = f'{word} {rng.choice(WORDS)[:rng.randint(1, 4)]}'
+        else:
+            query = str(10000 + rng.randrange(count))[:rng.randint(2, 6)]
+        samples.append(query)
+
+    def measure(label):
+        timings = []
+        for query in samples:
+            started = time.perf_counter()
+            matches = index.search(query)
+            len(matches)
+            matches[:per_page]
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"{label}: {queries} searches (count + first {per_page}): p50 {percentile(timings, 0.5):.2f} ms, "
+              f"p99 {percentile(timings, 0.99):.2f} ms, max {max(timings):.2f} ms")
+
+    measure("Built index")
+
+    # Changed products are served from the overlay until the next rebuild
+    changed = list(make_documents(changes, seed=3))
+    started = time.perf_counter()
+    index.apply(1, [doc['StockCode'] for doc in changed], changed)
+    print(f"Applied {changes} changed products in {(time.perf_counter() - started) * 1000:.1f} ms")
+    measure("With overlay")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure search index size, build time and query latency.')
+    parser.add_argument('--count', type=int, default=500_000)
+    parser.add_argument('--queries', type=int, default=2_000)
+    parser.add_argument('--per-page', type=int, default=12)
+    parser.add_argument('--changes', type=int, default=500)
+    args = parser.parse_args()
+    run(args.count, args.queries, args.per_page, args.changes)
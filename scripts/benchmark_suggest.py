@@ -0,0 +1,75 @@
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Allow running as `python scripts/benchmark_suggest.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.suggest_index import SuggestIndex
+
+WORDS = ('christmas glass ball lights pink cherry set blue flower candles bowl orchid '
+         'antique lily fairy white beaded garland string traditional ribbons lush greens '
+         'heart wicker small large vintage paisley tea cup saucer jumbo bag red retrospot '
+         'lunch box hanging metal sign wooden frame cushion cover doormat union jack').split()
+
+def make_documents(count, seed=1):
+    """Synthetic products shaped like data/products.csv rows, with skewed popularity."""
+    rng = random.Random(seed)
+    for n in range(count):
+        words = rng.sample(WORDS, rng.randint(3, 6)) + [f'{rng.randint(1, 99)}cm']
+        yield {
+            'StockCode': f'{10000 + n}{rng.choice("ABCDE") if n % 7 == 0 else ""}',
+            'Description': ' '.join(words).upper(),
+            'popularity': int(rng.paretovariate(1.2)),
+        }
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def run(count, budget_mb, queries, limit):
+    index = SuggestIndex(memory_budget_mb=budget_mb)
+    tracemalloc.start()
+    started = time.perf_counter()
+    index.build(make_documents(count))
+    build_seconds = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = index.stats()
+    print(f"Indexed {stats['products']} of {count} products, {stats['terms']} terms in {build_seconds:.1f}s")
+    print(f"Estimated {stats['estimated_mb']:.0f} MiB (budget {budget_mb:.0f} MiB), traced "
+          f"{current / 1024 / 1024:.0f} MiB, build peak {peak / 1024 / 1024:.0f} MiB")
+
+    rng = random.Random(2)
+    samples = []
+    for _ in range(queries):
+        word = rng.choice(WORDS)
+        kind = rng.random()
+        if kind < 0.4:
+            query = word[:rng.randint(1, len(word))]
+        elif kind < 0.7:
+            query = f'{word} {rng.choice(WORDS)[:rng.randint(1, 4)]}'
+        else:
+            query = str(10000 + rng.randrange(count))[:rng.randint(2, 6)]
+        samples.append(query)
+
+    timings = []
+    for query in samples:
+        started = time.perf_counter()
+        index.suggest(query, limit)
+        timings.append((time.perf_counter() - started) * 1e6)
+    print(f"{queries} lookups (top {limit}): p50 {percentile(timings, 0.5):.0f} µs, "
+          f"p99 {percentile(timings, 0.99):.0f} µs, max {max(timings):.0f} µs")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure suggestion index size, build time and lookup latency.')
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--budget-mb', type=float, default=256)
+    parser.add_argument('--queries', type=int, default=10_000)
+    parser.add_argument('--limit', type=int, default=8)
+    args = parser.parse_args()
+    run(args.count, args.budget_mb, args.queries, args.limit)
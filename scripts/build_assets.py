@@ -0,0 +1,30 @@
+import argparse
+import os
+import sys
+
+# Allow running as `python scripts/build_assets.py` from the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.utils.assets import build_assets, brotli, BUILD_DIR, MANIFEST_NAME
+
+DEFAULT_STATIC_FOLDER = os.path.join(PROJECT_ROOT, 'app', 'static')
+
+def run(static_folder=DEFAULT_STATIC_FOLDER):
+    manifest = build_assets(static_folder)
+    for source, target in sorted(manifest.items()):
+        path = os.path.join(static_folder, *target.split('/'))
+        sizes = [f"{os.path.getsize(path)} B"]
+        for suffix in ('.gz', '.br'):
+            if os.path.exists(path + suffix):
+                sizes.append(f"{suffix[1:]} {os.path.getsize(path + suffix)} B")
+        print(f"{source} -> {target} ({', '.join(sizes)})")
+    if brotli is None:
+        print("brotli is not installed; only gzip variants were written")
+    print(f"Wrote {len(manifest)} assets and {BUILD_DIR}/{MANIFEST_NAME}")
+    return manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Fingerprint and precompress static assets.')
+    parser.add_argument('--static-folder', default=DEFAULT_STATIC_FOLDER)
+    run(parser.parse_args().static_folder)
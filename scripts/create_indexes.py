@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Allow running as `python scripts/create_indexes.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import db_helper
+from app.utils.db_indexes import ensure_indexes, format_report
+
+def create_indexes():
+    report = ensure_indexes(db_helper.db)
+    for line in format_report(report):
+        print(line)
+
+    failed = [entry for entry in report if entry["status"] != "ok"]
+    if failed:
+        print(f"{len(failed)} index(es) could not be created.")
+    else:
+        print("All indexes are in place.")
+    return not failed
+
+if __name__ == "__main__":
+    sys.exit(0 if create_indexes() else 1)
@@ -0,0 +1,17 @@
+import os
+import sys
+
+# Allow running as `python scripts/dedupe_stock_codes.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import db_helper
+from app.utils.catalog_ingest import remove_duplicate_stock_codes
+
+def dedupe():
+    stock_codes = remove_duplicate_stock_codes(db_helper.db['products'])
+    if stock_codes:
+        db_helper.bump_catalog_version(stock_codes)
+    print(f"Removed duplicates of {len(stock_codes)} StockCodes.")
+
+if __name__ == "__main__":
+    dedupe()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+# Allow running as `python scripts/migrate_image_fields.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import db_helper
+from app.utils.catalog_ingest import migrate_image_fields
+
+def migrate():
+    updated = migrate_image_fields(db_helper.db['products'])
+    if updated:
+        # Image fields aren't searched, so no search index needs patching
+        db_helper.bump_catalog_version([])
+    print(f"Added image_urls/primary_image to {updated} products.")
+
+if __name__ == "__main__":
+    migrate()
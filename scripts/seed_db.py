@@ -1,48 +1,63 @@
-import csv
-from pymongo import MongoClient
-from dotenv import load_dotenv
+import argparse
 import os
-load_dotenv()
-
-def seed_database():
-    client = MongoClient(os.getenv('mongodb_url'),
-                             tlsAllowInvalidCertificates=True)
-    db = client["mydatabase"]
-    collection = db['products']
-    USD_TO_INR_RATE = 96
-    data_to_insert = []
-    if collection.count_documents({}) == 0:
-        try:
-            with open('/Users/abhinav/Documents/rp2/untitled folder/ShopSmart/data/products.csv', mode='r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                
-                for row in reader:
-                    # 1. Convert price to integer and INR
-                    try:
-                        row.pop('', None)
-                        price_usd = float(row['Price']) # Convert from string in CSV to float
-                        price_inr = int(price_usd * USD_TO_INR_RATE) # Convert to INR integer
-                        row['price_inr'] = price_inr # Add the new field
-                        
-                        # Optional: Convert other fields to their correct types if needed
-                        # row['stock_quantity'] = int(row['stock_quantity']) 
-                        del row['Price']
-                        data_to_insert.append(row)
-                    except ValueError:
-                        print(f"Skipping row due to invalid price data: {row}")
-
-                # 2. Perform bulk insert
-                if data_to_insert and collection.count_documents({}) == 0:
-                    collection.insert_many(data_to_insert)
-                    print(f"Successfully added {len(data_to_insert)} products with modified prices!")
-                elif collection.count_documents({}) > 0:
-                    print("Data already exists. Skipping import.")
-
-        except FileNotFoundError:
-            print("Error: data.csv not found in the scripts folder.")
-    else:
-        print("Database already contains data. Skipping import.")
+import sys
 
-if __name__ == "__main__":
-    seed_database()
+# Allow running as `python scripts/seed_db.py` from the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from app.utils import db_helper
+from app.utils.catalog_ingest import ingest_catalog, USD_TO_INR_RATE
+
+DEFAULT_CSV_PATH = os.path.join(PROJECT_ROOT, 'data', 'products.csv')
+
+def seed_database(path=DEFAULT_CSV_PATH, chunk_size=5000, writers=4,
+                  checkpoint_path=None, resume=False, usd_to_inr_rate=USD_TO_INR_RATE):
+    collection = db_helper.db['products']
+    try:
+        stats = ingest_catalog(
+            collection, path,
+            chunk_size=chunk_size,
+            writers=writers,
+            checkpoint_path=checkpoint_path,
+            resume=resume,
+            usd_to_inr_rate=usd_to_inr_rate
+        )
+    except FileNotFoundError:
+        print(f"Error: {path} not found.")
+        return None
+
+    # Make running app workers drop what they cached for the old catalog
+    db_helper.bump_catalog_version()
 
+    for row_number, error in stats['errors'][:20]:
+        print(f"Skipping row {row_number}: {error}")
+    if len(stats['errors']) > 20:
+        print(f"... and {len(stats['errors']) - 20} more invalid rows")
+
+    print(f"Read {stats['rows_read']} rows (resumed from row {stats['resumed_from']}), "
+          f"wrote {stats['rows_written']} products, skipped {len(stats['errors'])}, "
+          f"dropped {len(stats['duplicates'])} superseded by a later row for the same StockCode "
+          f"in {stats['elapsed']:.1f}s ({stats['rows_per_second']:.0f} rows/s)")
+    return stats
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Stream a products CSV into MongoDB.')
+    parser.add_argument('path', nargs='?', default=DEFAULT_CSV_PATH,
+                        help='CSV file in data/products.csv format')
+    parser.add_argument('--chunk-size', type=int, default=5000,
+                        help='rows per bulk_write batch')
+    parser.add_argument('--writers', type=int, default=4,
+                        help='concurrent bulk writers')
+    parser.add_argument('--checkpoint', default=None,
+                        help='checkpoint file recording completed rows')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue from the checkpoint instead of the first row')
+    parser.add_argument('--usd-to-inr', type=float, default=USD_TO_INR_RATE,
+                        help='exchange rate applied to the Price column')
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    seed_database(args.path, args.chunk_size, args.writers,
+                  args.checkpoint, args.resume, args.usd_to_inr)